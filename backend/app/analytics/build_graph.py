@@ -464,6 +464,16 @@ def build_value_edges(min_support: int = 200):
     return edges
 
 
+def ensure_graph_indexes():
+    """
+    Create indexes used by the /graph endpoint.
+    Nodes are read top-N by support; edges are filtered by family/support
+    and source/target membership.
+    """
+    db.graph_nodes.create_index([("support", -1)])
+    db.graph_edges.create_index([("family", 1), ("support", -1), ("source", 1), ("target", 1)])
+
+
 def build_graph(min_support: int = 200):
     """
     Build complete graph: nodes and all edge families.
@@ -476,6 +486,7 @@ def build_graph(min_support: int = 200):
     assoc_edges = build_association_edges(min_support=min_support)
     ctx_edges = build_context_edges(min_support=min_support)
     val_edges = build_value_edges(min_support=min_support)
+    ensure_graph_indexes()
     
     print("\n" + "=" * 60)
     print("GRAPH BUILD COMPLETE")
@@ -7,5 +7,27 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "nba_pairs")
 
-client = MongoClient(MONGO_URI)
+# Connection pool settings (one client per process, shared by all requests)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000"))
+
+client = MongoClient(
+    MONGO_URI,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    retryReads=True,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+)
 db = client[DB_NAME]
+
+
+def ping_db():
+    """
+    Verify the MongoDB server is reachable.
+
+    Also opens the first pooled connection so the first request does not pay
+    the handshake cost. Raises pymongo.errors.ServerSelectionTimeoutError if
+    the server cannot be reached within MONGO_SERVER_SELECTION_TIMEOUT_MS.
+    """
+    client.admin.command("ping")
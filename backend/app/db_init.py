@@ -21,5 +21,9 @@ def init_db():
         else:
             print(f"Collection exists: {name}")
 
+    # Future-games lookups in the ML API filter and sort on GAME_DATE
+    db.games.create_index([("GAME_DATE", 1)])
+    print("Ensured index: games.GAME_DATE")
+
 if __name__ == "__main__":
     init_db()
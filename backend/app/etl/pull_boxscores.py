@@ -32,11 +32,11 @@ def game_already_exists(game_id: str) -> bool:
     count = db.player_game_stats.count_documents({"GAME_ID": game_id})
     return count > 0
 
-def pull_boxscore_traditional(game_id: str, max_retries=3):
+def fetch_boxscore_traditional(game_id: str, max_retries=3):
     """
-    Pull boxscore for a game with retry logic for network errors.
+    Fetch and parse the player boxscore for a game, without writing to Mongo.
     nba_get already has retry logic, but we add an extra layer for persistent failures.
-    Returns (success: bool, count: int)
+    Returns (success: bool, docs: list)
     """
     for attempt in range(1, max_retries + 1):
         try:
@@ -44,7 +44,7 @@ def pull_boxscore_traditional(game_id: str, max_retries=3):
 
             result_sets = data.get("resultSets", [])
             if not result_sets:
-                return (True, 0)
+                return (True, [])
 
             # Find the "PlayerStats" table
             player_rs = None
@@ -54,7 +54,7 @@ def pull_boxscore_traditional(game_id: str, max_retries=3):
                     break
 
             if player_rs is None:
-                return (True, 0)
+                return (True, [])
 
             headers = player_rs["headers"]
             rows = player_rs["rowSet"]
@@ -63,12 +63,7 @@ def pull_boxscore_traditional(game_id: str, max_retries=3):
             for d in docs:
                 d["GAME_ID"] = game_id
 
-            if docs:
-                # upsert strategy: delete existing for that game then insert fresh
-                db.player_game_stats.delete_many({"GAME_ID": game_id})
-                db.player_game_stats.insert_many(docs)
-
-            return (True, len(docs))
+            return (True, docs)
             
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
             # Network errors: retry with exponential backoff
@@ -79,7 +74,7 @@ def pull_boxscore_traditional(game_id: str, max_retries=3):
                 continue
             else:
                 print(f"  Failed after {max_retries} attempts: {type(e).__name__}")
-                return (False, 0)
+                return (False, [])
                 
         except requests.exceptions.HTTPError as e:
             # HTTP errors (429, 5xx): retry with exponential backoff
@@ -92,11 +87,11 @@ def pull_boxscore_traditional(game_id: str, max_retries=3):
                     continue
                 else:
                     print(f"  Failed after {max_retries} attempts: HTTP {status_code}")
-                    return (False, 0)
+                    return (False, [])
             else:
                 # Other HTTP errors: don't retry
                 print(f"  HTTP error: {status_code if status_code else 'unknown'}")
-                return (False, 0)
+                return (False, [])
                 
         except Exception as e:
             # Other errors (including from nba_get after its retries): log and continue
@@ -107,9 +102,36 @@ def pull_boxscore_traditional(game_id: str, max_retries=3):
                 continue
             else:
                 print(f"  Failed after {max_retries} attempts: {type(e).__name__}: {str(e)[:100]}")
-                return (False, 0)
+                return (False, [])
     
-    return (False, 0)
+    return (False, [])
+
+def replace_boxscores(game_ids, docs):
+    """
+    Write player boxscore docs for a batch of games in one round-trip each.
+    Upsert strategy: delete existing rows for those games, then insert fresh.
+    """
+    if not docs:
+        return
+    db.player_game_stats.delete_many({"GAME_ID": {"$in": list(game_ids)}})
+    db.player_game_stats.insert_many(docs, ordered=False)
+
+def get_existing_game_ids():
+    """
+    Return the set of GAME_IDs that already have player_game_stats rows.
+    One distinct query instead of a game_already_exists() round-trip per game.
+    """
+    return set(db.player_game_stats.distinct("GAME_ID"))
+
+def pull_boxscore_traditional(game_id: str, max_retries=3):
+    """
+    Pull boxscore for a game with retry logic for network errors and store it.
+    Returns (success: bool, count: int)
+    """
+    success, docs = fetch_boxscore_traditional(game_id, max_retries=max_retries)
+    if docs:
+        replace_boxscores([game_id], docs)
+    return (success, len(docs))
 
 def run(limit=500, sleep_seconds=1.2, resume=True):
     """
@@ -125,13 +147,9 @@ def run(limit=500, sleep_seconds=1.2, resume=True):
     
     if resume:
         # Filter out games that already exist
-        existing_count = 0
-        filtered_ids = []
-        for gid in game_ids:
-            if game_already_exists(gid):
-                existing_count += 1
-            else:
-                filtered_ids.append(gid)
+        existing_ids = get_existing_game_ids()
+        filtered_ids = [gid for gid in game_ids if gid not in existing_ids]
+        existing_count = len(game_ids) - len(filtered_ids)
         game_ids = filtered_ids
         if existing_count > 0:
             print(f"Skipping {existing_count} games that already exist (resume mode)")
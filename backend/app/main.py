@@ -1,13 +1,17 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from app.db import db
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from app.db import db, ping_db
+from pymongo.errors import PyMongoError
+from app.pair_cache import pair_cache
 from app.analytics.ev_utils import american_to_implied_prob, compute_ev, compute_joint_ev
-import math
 import json
 import csv
 import io
 import os
+import heapq
+import numpy as np
 from pathlib import Path
 from typing import Literal, Optional, List, Dict, Any
 
@@ -15,15 +19,75 @@ from typing import Literal, Optional, List, Dict, Any
 try:
     from app.ml_api import (
         get_ml_metrics, get_predictions, get_calibration, get_ablation,
-        get_deciles, get_picks_summary, get_coefficients, get_timeframe, get_picks, get_future_games
+        get_deciles, get_picks_summary, get_coefficients, get_timeframe, get_picks, get_future_games,
+        preload_artifacts, iter_predictions_ndjson, artifact_etag, PREDICTION_ARTIFACTS,
+        get_dashboard_bundle, DASHBOARD_BUNDLE_ARTIFACTS
     )
     ML_API_AVAILABLE = True
 except ImportError:
     ML_API_AVAILABLE = False
 
+# orjson renders the (large) ML dashboard responses
+import orjson
+
+
+class MLJSONResponse(JSONResponse):
+    """
+    JSON response for the ML dashboard endpoints.
+
+    Endpoints return this directly so FastAPI skips its jsonable_encoder pass
+    (the ml_api functions already return JSON-safe data), and the body is
+    serialized by orjson in C.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+# Artifacts only change when the ML pipeline re-runs
+ML_CACHE_CONTROL = "public, max-age=60"
+
+
+def ml_artifact_response(request: Request, artifacts, build):
+    """
+    Return build() as an MLJSONResponse with ETag/Cache-Control headers.
+
+    The ETag is derived from the artifacts' mtimes; if the client already has
+    that version (If-None-Match), reply 304 without building the payload.
+    """
+    headers = {"Cache-Control": ML_CACHE_CONTROL}
+    etag = artifact_etag(*artifacts)
+    if etag is not None:
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+    return MLJSONResponse(build(), headers=headers)
+
 # Create FastAPI app instance
 app = FastAPI()
 
+
+@app.on_event("startup")
+def check_db_connection():
+    """
+    Warm the MongoDB connection pool at startup.
+    
+    An unreachable server only logs a warning: the artifact-only /api/* endpoints
+    don't need the database, so the API still starts.
+    """
+    try:
+        ping_db()
+    except PyMongoError as e:
+        print(f"WARNING: MongoDB is unreachable at startup ({type(e).__name__}); database endpoints will fail until it is available")
+
+
+@app.on_event("startup")
+def load_ml_artifacts():
+    """Parse predictions and load the model once at startup instead of on first request."""
+    if ML_API_AVAILABLE:
+        preload_artifacts()
+
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +100,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (predictions/picks payloads repeat every column name per row)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 @app.get("/pairs")
 def get_pairs():
@@ -43,48 +110,49 @@ def get_pairs():
     GET endpoint that returns all documents from the MongoDB collection 'pair_stats'.
     Excludes MongoDB's _id field and returns data in the expected format.
     """
-    # Fetch all documents from pair_stats collection
-    pairs_cursor = db.pair_stats.find({})
-    
-    # Convert to list and exclude _id field
-    pairs_list = []
-    for doc in pairs_cursor:
-        # Create a new dict without _id
-        pair_doc = {
-            "A": doc.get("A"),
-            "B": doc.get("B"),
-            "lift": doc.get("lift"),
-            "phi": doc.get("phi"),
-            "n": doc.get("n"),
-        }
-        pairs_list.append(pair_doc)
-    
-    return {"pairs": pairs_list}
+    # Projection already yields the response shape, so the cursor is returned as-is
+    pairs_cursor = db.pair_stats.find({}, {"_id": 0, "A": 1, "B": 1, "lift": 1, "phi": 1, "n": 1})
+    return {"pairs": list(pairs_cursor)}
 
 
-def classify_pair(lift: float, phi: float) -> str:
+def classify_pair(lift, phi):
     """
-    Classify a pair as STACK, HEDGE, or NEUTRAL.
+    Classify pairs as STACK, HEDGE, or NEUTRAL (vectorized over arrays).
     STACK: lift > 1.10 AND phi > 0.10
     HEDGE: lift < 0.95 AND phi < -0.10
     NEUTRAL: everything else
     """
-    if lift > 1.10 and phi > 0.10:
-        return "stack"
-    elif lift < 0.95 and phi < -0.10:
-        return "hedge"
-    else:
-        return "neutral"
+    return np.select(
+        [(lift > 1.10) & (phi > 0.10), (lift < 0.95) & (phi < -0.10)],
+        ["stack", "hedge"],
+        default="neutral",
+    )
 
 
-def compute_confidence(phi: float, n: int) -> float:
+def compute_confidence(phi, log_n):
     """
     Compute confidence score: abs(phi) * log10(n)
-    Returns 0 if n <= 1
+    log_n is 0 where n <= 1, so the score is 0 there.
     """
-    if n <= 1:
-        return 0.0
-    return abs(phi) * math.log10(n)
+    return np.abs(phi) * log_n
+
+
+def top_indices(idx, key, limit):
+    """Return up to `limit` entries of idx ordered by key descending (stable for ties)."""
+    neg_key = -key
+    if len(idx) > limit:
+        # Partial selection: keep only rows at or above the limit-th best key
+        # (ties included, original order kept) before sorting
+        kth = np.partition(neg_key, limit - 1)[limit - 1]
+        keep = np.flatnonzero(neg_key <= kth)
+        idx = idx[keep]
+        neg_key = neg_key[keep]
+    order = np.argsort(neg_key, kind="stable")
+    return idx[order[:limit]]
+
+
+# Optional uncertainty fields passed through by the explorer when present
+EXPLORER_CI_FIELDS = ["lift_lo", "lift_hi", "phi_lo", "phi_hi", "pBA_mean", "pBA_lo", "pBA_hi"]
 
 
 @app.get("/pairs/explorer")
@@ -98,68 +166,47 @@ def get_pairs_explorer(
     GET endpoint for pairs explorer with filtering and sorting.
     Returns filtered and sorted pair_stats documents.
     """
-    # Fetch all documents from pair_stats collection
-    pairs_cursor = db.pair_stats.find({})
+    docs, cols = pair_cache.get()
+    lift = cols["lift"]
+    phi = cols["phi"]
+    
+    # Compute confidence and classify all pairs at once
+    confidence = compute_confidence(phi, cols["log_n"])
+    pair_kind = classify_pair(lift, phi)
+    
+    # Filter by min_n and kind
+    mask = cols["n"] >= min_n
+    if kind != "all":
+        mask &= pair_kind == kind
+    idx = np.flatnonzero(mask)
+    
+    # Sort by requested field and apply limit
+    if sort == "lift":
+        sort_key = lift
+    elif sort == "abs_phi":
+        sort_key = np.abs(phi)
+    else:  # confidence
+        sort_key = confidence
+    idx = top_indices(idx, sort_key[idx], limit)
     
-    # Convert to list with computed confidence and classification
     pairs_list = []
-    for doc in pairs_cursor:
-        n = doc.get("n", 0)
-        lift = doc.get("lift", 0.0)
-        phi = doc.get("phi", 0.0)
-        
-        # Filter by min_n
-        if n < min_n:
-            continue
-        
-        # Compute confidence and classify
-        confidence = compute_confidence(phi, n)
-        pair_kind = classify_pair(lift, phi)
-        
-        # Filter by kind
-        if kind != "all" and pair_kind != kind:
-            continue
-        
+    for i in idx:
+        doc = docs[i]
         # Create pair doc without _id (include CI fields if present)
         pair_doc = {
             "A": doc.get("A"),
             "B": doc.get("B"),
-            "n": n,
-            "lift": lift,
-            "phi": phi,
-            "confidence": confidence,
+            "n": doc.get("n", 0),
+            "lift": doc.get("lift", 0.0),
+            "phi": doc.get("phi", 0.0),
+            "confidence": float(confidence[i]),
             "pair": doc.get("pair", f"{doc.get('A')} ↔ {doc.get('B')}"),
         }
-        
-        # Include uncertainty fields if present
-        if "lift_lo" in doc:
-            pair_doc["lift_lo"] = doc.get("lift_lo")
-        if "lift_hi" in doc:
-            pair_doc["lift_hi"] = doc.get("lift_hi")
-        if "phi_lo" in doc:
-            pair_doc["phi_lo"] = doc.get("phi_lo")
-        if "phi_hi" in doc:
-            pair_doc["phi_hi"] = doc.get("phi_hi")
-        if "pBA_mean" in doc:
-            pair_doc["pBA_mean"] = doc.get("pBA_mean")
-        if "pBA_lo" in doc:
-            pair_doc["pBA_lo"] = doc.get("pBA_lo")
-        if "pBA_hi" in doc:
-            pair_doc["pBA_hi"] = doc.get("pBA_hi")
-        
+        for field in EXPLORER_CI_FIELDS:
+            if field in doc:
+                pair_doc[field] = doc[field]
         pairs_list.append(pair_doc)
     
-    # Sort by requested field
-    if sort == "lift":
-        pairs_list.sort(key=lambda x: x["lift"], reverse=True)
-    elif sort == "abs_phi":
-        pairs_list.sort(key=lambda x: abs(x["phi"]), reverse=True)
-    else:  # confidence
-        pairs_list.sort(key=lambda x: x["confidence"], reverse=True)
-    
-    # Apply limit
-    pairs_list = pairs_list[:limit]
-    
     return {
         "meta": {
             "min_n": min_n,
@@ -177,44 +224,28 @@ def get_pairs_summary():
     """
     GET endpoint that returns summary statistics for pair_stats collection.
     """
-    # Fetch all documents
-    pairs_cursor = db.pair_stats.find({})
+    docs, cols = pair_cache.get()
+    n_values = cols["n"]
+    pair_kind = classify_pair(cols["lift"], cols["phi"])
     
-    total = 0
-    n_values = []
-    stacks = 0
-    hedges = 0
-    neutral = 0
-    
-    for doc in pairs_cursor:
-        total += 1
-        n = doc.get("n", 0)
-        lift = doc.get("lift", 0.0)
-        phi = doc.get("phi", 0.0)
-        
-        n_values.append(n)
-        pair_kind = classify_pair(lift, phi)
-        
-        if pair_kind == "stack":
-            stacks += 1
-        elif pair_kind == "hedge":
-            hedges += 1
-        else:
-            neutral += 1
+    total = len(docs)
+    stacks = int(np.count_nonzero(pair_kind == "stack"))
+    hedges = int(np.count_nonzero(pair_kind == "hedge"))
+    neutral = total - stacks - hedges
     
     # Compute n statistics
-    n_min = min(n_values) if n_values else 0
-    n_max = max(n_values) if n_values else 0
-    
-    # Compute median
+    n_min = 0
+    n_max = 0
     n_median = 0
-    if n_values:
-        sorted_n = sorted(n_values)
-        mid = len(sorted_n) // 2
-        if len(sorted_n) % 2 == 0:
-            n_median = (sorted_n[mid - 1] + sorted_n[mid]) / 2
+    if total:
+        sorted_n = np.sort(n_values)
+        n_min = sorted_n[0].item()
+        n_max = sorted_n[-1].item()
+        mid = total // 2
+        if total % 2 == 0:
+            n_median = (sorted_n[mid - 1].item() + sorted_n[mid].item()) / 2
         else:
-            n_median = sorted_n[mid]
+            n_median = sorted_n[mid].item()
     
     return {
         "total": total,
@@ -235,21 +266,38 @@ def get_events_probs():
     GET endpoint that returns event probabilities with credible intervals.
     Returns event_probs documents sorted by n descending.
     """
-    events_cursor = db.event_probs.find({}).sort("n", -1)
+    events_cursor = db.event_probs.find(
+        {}, {"_id": 0, "event": 1, "n": 1, "k": 1, "p_mean": 1, "p_lo": 1, "p_hi": 1}
+    ).sort("n", -1)
+    return {"events": list(events_cursor)}
+
+
+def _recommendation(doc, score, reason):
+    """Build a stack/hedge candidate entry from a pair_stats document."""
+    pB = doc.get("pB", 0.0)
+    pBA_mean = doc.get("pBA_mean")
+    pBA_lo = doc.get("pBA_lo")
+    pBA_hi = doc.get("pBA_hi")
+    if pBA_mean is not None and pBA_lo is not None and pBA_hi is not None:
+        reason += f" P(B|A)={pBA_mean:.3f} [{pBA_lo:.3f}, {pBA_hi:.3f}] vs baseline P(B)={pB:.3f}."
     
-    events_list = []
-    for doc in events_cursor:
-        event_doc = {
-            "event": doc.get("event"),
-            "n": doc.get("n"),
-            "k": doc.get("k"),
-            "p_mean": doc.get("p_mean"),
-            "p_lo": doc.get("p_lo"),
-            "p_hi": doc.get("p_hi"),
-        }
-        events_list.append(event_doc)
-    
-    return {"events": events_list}
+    return {
+        "A": doc.get("A"),
+        "B": doc.get("B"),
+        "n": doc.get("n", 0),
+        "lift": doc.get("lift", 0.0),
+        "lift_lo": doc.get("lift_lo"),
+        "lift_hi": doc.get("lift_hi"),
+        "phi": doc.get("phi", 0.0),
+        "phi_lo": doc.get("phi_lo"),
+        "phi_hi": doc.get("phi_hi"),
+        "pB": pB,
+        "pBA_mean": pBA_mean,
+        "pBA_lo": pBA_lo,
+        "pBA_hi": pBA_hi,
+        "score": score,
+        "reason": reason,
+    }
 
 
 @app.get("/recommendations")
@@ -261,94 +309,35 @@ def get_recommendations(
     GET endpoint that returns ranked stack and hedge candidates based on probabilities and uncertainty.
     This does NOT output betting picks - only ranked candidates for analysis.
     """
-    pairs_cursor = db.pair_stats.find({})
+    docs, cols = pair_cache.get()
+    lift = cols["lift"]
+    phi = cols["phi"]
+    pB = cols["pB"]
+    pBA_mean = cols["pBA_mean"]
+    log_n = cols["log_n"]
+    has_pBA = ~np.isnan(pBA_mean) & (pB > 0)
+    eligible = cols["n"] >= min_n
     
-    stacks = []
-    hedges = []
-    
-    for doc in pairs_cursor:
-        n = doc.get("n", 0)
-        if n < min_n:
-            continue
-        
-        lift = doc.get("lift", 0.0)
-        lift_lo = doc.get("lift_lo")
-        lift_hi = doc.get("lift_hi")
-        phi = doc.get("phi", 0.0)
-        phi_lo = doc.get("phi_lo")
-        phi_hi = doc.get("phi_hi")
-        pB = doc.get("pB", 0.0)
-        pBA_mean = doc.get("pBA_mean")
-        pBA_lo = doc.get("pBA_lo")
-        pBA_hi = doc.get("pBA_hi")
-        
-        # Stack candidate filter: n >= min_n, lift_lo > 1.0, phi > 0
-        if lift_lo is not None and lift_lo > 1.0 and phi > 0:
-            # Stack score: (pBA_mean - pB) * log10(n)
-            if pBA_mean is not None and pB > 0:
-                score = (pBA_mean - pB) * math.log10(n) if n > 1 else 0.0
-            else:
-                score = lift * math.log10(n) if n > 1 else 0.0
-            
-            reason = "Stack candidate because lift_lo > 1 and phi > 0."
-            if pBA_mean is not None and pBA_lo is not None and pBA_hi is not None:
-                reason += f" P(B|A)={pBA_mean:.3f} [{pBA_lo:.3f}, {pBA_hi:.3f}] vs baseline P(B)={pB:.3f}."
-            
-            stacks.append({
-                "A": doc.get("A"),
-                "B": doc.get("B"),
-                "n": n,
-                "lift": lift,
-                "lift_lo": lift_lo,
-                "lift_hi": lift_hi,
-                "phi": phi,
-                "phi_lo": phi_lo,
-                "phi_hi": phi_hi,
-                "pB": pB,
-                "pBA_mean": pBA_mean,
-                "pBA_lo": pBA_lo,
-                "pBA_hi": pBA_hi,
-                "score": score,
-                "reason": reason,
-            })
-        
-        # Hedge candidate filter: n >= min_n, phi_hi < 0
-        if phi_hi is not None and phi_hi < 0:
-            # Hedge score: (pB - pBA_mean) * log10(n)
-            if pBA_mean is not None and pB > 0:
-                score = (pB - pBA_mean) * math.log10(n) if n > 1 else 0.0
-            else:
-                score = abs(phi) * math.log10(n) if n > 1 else 0.0
-            
-            reason = "Hedge candidate because phi_hi < 0."
-            if pBA_mean is not None and pBA_lo is not None and pBA_hi is not None:
-                reason += f" P(B|A)={pBA_mean:.3f} [{pBA_lo:.3f}, {pBA_hi:.3f}] vs baseline P(B)={pB:.3f}."
-            
-            hedges.append({
-                "A": doc.get("A"),
-                "B": doc.get("B"),
-                "n": n,
-                "lift": lift,
-                "lift_lo": lift_lo,
-                "lift_hi": lift_hi,
-                "phi": phi,
-                "phi_lo": phi_lo,
-                "phi_hi": phi_hi,
-                "pB": pB,
-                "pBA_mean": pBA_mean,
-                "pBA_lo": pBA_lo,
-                "pBA_hi": pBA_hi,
-                "score": score,
-                "reason": reason,
-            })
+    # Stack candidate filter: n >= min_n, lift_lo > 1.0, phi > 0
+    # Stack score: (pBA_mean - pB) * log10(n), falling back to lift * log10(n)
+    stack_idx = np.flatnonzero(eligible & (cols["lift_lo"] > 1.0) & (phi > 0))
+    stack_score = np.where(has_pBA, (pBA_mean - pB) * log_n, lift * log_n)
+    stack_idx = top_indices(stack_idx, stack_score[stack_idx], limit)
     
-    # Sort by score descending
-    stacks.sort(key=lambda x: x["score"], reverse=True)
-    hedges.sort(key=lambda x: x["score"], reverse=True)
+    # Hedge candidate filter: n >= min_n, phi_hi < 0
+    # Hedge score: (pB - pBA_mean) * log10(n), falling back to abs(phi) * log10(n)
+    hedge_idx = np.flatnonzero(eligible & (cols["phi_hi"] < 0))
+    hedge_score = np.where(has_pBA, (pB - pBA_mean) * log_n, np.abs(phi) * log_n)
+    hedge_idx = top_indices(hedge_idx, hedge_score[hedge_idx], limit)
     
-    # Apply limit
-    stacks = stacks[:limit]
-    hedges = hedges[:limit]
+    stacks = [
+        _recommendation(docs[i], float(stack_score[i]), "Stack candidate because lift_lo > 1 and phi > 0.")
+        for i in stack_idx
+    ]
+    hedges = [
+        _recommendation(docs[i], float(hedge_score[i]), "Hedge candidate because phi_hi < 0.")
+        for i in hedge_idx
+    ]
     
     return {
         "stacks": stacks,
@@ -372,12 +361,12 @@ def get_graph(
         
         # Get nodes (exclude _id)
         nodes_cursor = db.graph_nodes.find({}, {"_id": 0}).sort("support", -1).limit(max_nodes)
-        node_ids = set()
+        node_ids_list = []
         nodes_list = []
         for doc in nodes_cursor:
             node_id = doc.get("node_id")
             if node_id:
-                node_ids.add(node_id)
+                node_ids_list.append(node_id)
                 nodes_list.append({
                     "id": node_id,
                     "type": doc.get("type", "event"),
@@ -385,9 +374,10 @@ def get_graph(
                     "support": doc.get("support", 0),
                 })
         
-        # Get edges (only between nodes we're returning, exclude _id)
-        # Convert node_ids set to list for MongoDB $in query (sets are not JSON-serializable)
-        node_ids_list = list(node_ids)
+        # Get edges (only between nodes we're returning, exclude _id). A plain
+        # find with $in on source/target can use the graph_edges index from
+        # build_graph.ensure_graph_indexes, and results stream in batches rather
+        # than being packed into one (16 MB-capped) aggregation document
         edges_cursor = db.graph_edges.find({
             "family": {"$in": family_list},
             "support": {"$gte": min_support},
@@ -397,23 +387,14 @@ def get_graph(
         
         edges_list = []
         for doc in edges_cursor:
-            # Convert metrics dict, ensuring no sets (sets are not JSON-serializable)
-            metrics = doc.get("metrics", {})
-            if isinstance(metrics, dict):
-                metrics_clean = {}
-                for k, v in metrics.items():
-                    if isinstance(v, set):
-                        metrics_clean[k] = list(v)
-                    else:
-                        metrics_clean[k] = v
-                metrics = metrics_clean
-            
+            # metrics come straight from BSON (build_graph writes plain floats),
+            # so they are already JSON-serializable
             edges_list.append({
                 "source": doc.get("source"),
                 "target": doc.get("target"),
                 "family": doc.get("family"),
                 "weight": doc.get("weight", 0.0),
-                "metrics": metrics,
+                "metrics": doc.get("metrics", {}),
                 "support": doc.get("support", 0),
                 "explain": doc.get("explain", ""),
                 "classification": doc.get("classification"),
@@ -447,14 +428,13 @@ def get_recommendations_ev(
     GET endpoint that returns EV-ranked recommendations.
     Does NOT output betting picks - only probabilistic insights and EV estimates.
     """
-    pairs_cursor = db.pair_stats.find({})
+    docs, cols = pair_cache.get()
     
     candidates = []
     
-    for doc in pairs_cursor:
+    for i in np.flatnonzero(cols["n"] >= min_n):
+        doc = docs[i]
         n = doc.get("n", 0)
-        if n < min_n:
-            continue
         
         pA = doc.get("pA", 0.0)
         pB = doc.get("pB", 0.0)
@@ -518,9 +498,8 @@ def get_recommendations_ev(
             "reasoning": reasoning,
         })
     
-    # Sort by score descending
-    candidates.sort(key=lambda x: x["score"], reverse=True)
-    candidates = candidates[:limit]
+    # Top candidates by score descending
+    candidates = heapq.nlargest(limit, candidates, key=lambda x: x["score"])
     
     return {
         "candidates": candidates,
@@ -545,71 +524,88 @@ def api_health_check():
 
 
 @app.get("/api/metrics")
-def api_get_metrics():
+def api_get_metrics(request: Request):
     """Get ML metrics from metrics.json."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_ml_metrics()
+    return ml_artifact_response(request, ("metrics.json",), get_ml_metrics)
 
 
 @app.get("/api/predictions")
-def api_get_predictions(limit: int = Query(1000, ge=1, le=10000, description="Max rows to return")):
+def api_get_predictions(request: Request, limit: int = Query(1000, ge=1, le=10000, description="Max rows to return")):
     """Get predictions from predictions.csv as JSON."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_predictions(limit=limit)
+    return ml_artifact_response(request, PREDICTION_ARTIFACTS, lambda: get_predictions(limit=limit))
+
+
+@app.get("/api/predictions/stream")
+def api_stream_predictions(limit: int = Query(1000, ge=1, le=10000, description="Max rows to return")):
+    """Stream predictions as newline-delimited JSON (one record per line)."""
+    if not ML_API_AVAILABLE:
+        raise HTTPException(status_code=503, detail="ML API not available")
+    return StreamingResponse(iter_predictions_ndjson(limit=limit), media_type="application/x-ndjson")
 
 
 @app.get("/api/calibration")
-def api_get_calibration():
+def api_get_calibration(request: Request):
     """Get calibration table from calibration.csv as JSON."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_calibration()
+    return ml_artifact_response(request, ("calibration.csv",), get_calibration)
 
 
 @app.get("/api/ablation")
-def api_get_ablation():
+def api_get_ablation(request: Request):
     """Get ablation results from ablation_results.json."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_ablation()
+    return ml_artifact_response(request, ("ablation_results.json",), get_ablation)
 
 
 @app.get("/api/deciles")
-def api_get_deciles():
+def api_get_deciles(request: Request):
     """Get deciles analysis from picks_by_decile.csv as JSON."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_deciles()
+    return ml_artifact_response(request, ("picks_by_decile.csv",), get_deciles)
 
 
 @app.get("/api/picks_summary")
-def api_get_picks_summary():
+def api_get_picks_summary(request: Request):
     """Get picks summary from picks_summary.json."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_picks_summary()
+    return ml_artifact_response(request, ("picks_summary.json",), get_picks_summary)
 
 
 @app.get("/api/coefficients")
-def api_get_coefficients():
+def api_get_coefficients(request: Request):
     """Get model coefficients from coefficients.json."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_coefficients()
+    return ml_artifact_response(request, ("coefficients.json",), get_coefficients)
 
 
 @app.get("/api/timeframe")
-def api_get_timeframe():
+def api_get_timeframe(request: Request):
     """Get timeframe (min/max date) from metrics or predictions."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_timeframe()
+    return ml_artifact_response(request, ("metrics.json",) + PREDICTION_ARTIFACTS, get_timeframe)
+
+
+@app.get("/api/dashboard_bundle")
+def api_get_dashboard_bundle(request: Request):
+    """Get metrics, timeframe, calibration, ablation, deciles, picks summary and coefficients in one call."""
+    if not ML_API_AVAILABLE:
+        raise HTTPException(status_code=503, detail="ML API not available")
+    return ml_artifact_response(request, DASHBOARD_BUNDLE_ARTIFACTS, get_dashboard_bundle)
 
 
 @app.get("/api/picks")
 def api_get_picks(
+    request: Request,
     limit: int = Query(100, ge=1, le=10000, description="Max picks to return"),
     sort: str = Query("confidence", description="Sort by 'confidence' or 'date'"),
     threshold: Optional[float] = Query(None, ge=0, le=0.5, description="Min confidence |p-0.5|"),
@@ -618,7 +614,10 @@ def api_get_picks(
     """Get example picks from predictions.csv."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_picks(limit=limit, sort=sort, threshold=threshold, topk=topk)
+    return ml_artifact_response(
+        request, PREDICTION_ARTIFACTS,
+        lambda: get_picks(limit=limit, sort=sort, threshold=threshold, topk=topk)
+    )
 
 
 @app.get("/api/future_games")
@@ -631,7 +630,7 @@ def api_get_future_games(
     """Get future games with model predictions."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_future_games(date_from=date_from, date_to=date_to, min_confidence=min_confidence, limit=limit)
+    return MLJSONResponse(get_future_games(date_from=date_from, date_to=date_to, min_confidence=min_confidence, limit=limit))
 
 
 @app.get("/api/future_recommendations")
@@ -642,4 +641,4 @@ def api_get_future_recommendations(
     """Get future game recommendations (high confidence picks only)."""
     if not ML_API_AVAILABLE:
         raise HTTPException(status_code=503, detail="ML API not available")
-    return get_future_games(min_confidence=threshold, limit=limit)
+    return MLJSONResponse(get_future_games(min_confidence=threshold, limit=limit))
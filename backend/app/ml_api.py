@@ -5,16 +5,169 @@ Separate module for ML dashboard to keep main.py clean.
 from fastapi import Query, HTTPException
 from pathlib import Path
 import json
+import numpy as np
 import pandas as pd
 import os
+import threading
+import time
 from datetime import datetime
+from functools import lru_cache
+
+# pyarrow enables predictions.parquet and the faster pyarrow CSV parser
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# orjson serializes streamed rows
+import orjson
 
 # ML artifacts path (relative to project root)
 ML_ARTIFACTS_DIR = Path(__file__).parent.parent / "ml" / "artifacts"
 
+# Seconds to reuse the historical events frame used for rolling features
+ML_HISTORY_CACHE_TTL = float(os.getenv("ML_HISTORY_CACHE_TTL", "300"))
+_history_cache = {"ts": None, "df": None}
+# Held while checking/refreshing _history_cache, so concurrent requests after
+# the TTL expires wait for one reload instead of each scanning MongoDB
+_history_lock = threading.Lock()
 
-def make_json_safe(obj):
-    """Convert pandas/numpy types to JSON-safe Python types."""
+# games fields used by get_future_games / predict_future_games (ids, date,
+# market lines and the context features the model reads)
+FUTURE_GAME_FIELDS = [
+    "GAME_ID", "TEAM_ID", "GAME_DATE", "TEAM_ABBREVIATION",
+    "TEAM_TOTAL_LINE", "GAME_TOTAL_LINE",
+    "is_home", "is_competitive", "pace_bucket",
+]
+
+
+def _artifact_key(filename):
+    """
+    Return (path_str, mtime_ns) for an artifact, or raise 404 if it is missing.
+
+    The mtime is part of the cache key of the loaders below, so a re-run of the
+    ML pipeline (which rewrites the artifacts) invalidates the cached copy.
+    """
+    path = ML_ARTIFACTS_DIR / filename
+    try:
+        return str(path), path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{filename} not found")
+
+
+def artifact_etag(*filenames):
+    """
+    Build an HTTP ETag from the mtimes of the given artifacts.
+
+    Returns None if none of the files exist (the endpoint will 404 anyway).
+    """
+    parts = []
+    for filename in filenames:
+        try:
+            parts.append(format((ML_ARTIFACTS_DIR / filename).stat().st_mtime_ns, "x"))
+        except FileNotFoundError:
+            parts.append("0")
+    if all(part == "0" for part in parts):
+        return None
+    return '"' + "-".join(parts) + '"'
+
+
+# Files load_predictions_df() may read from
+PREDICTION_ARTIFACTS = ("predictions.csv", "predictions.parquet")
+
+
+# Cached artifact loaders. Results are shared between requests: treat them as
+# read-only (copy before modifying).
+@lru_cache(maxsize=32)
+def _load_json(path_str, mtime_ns):
+    with open(path_str, "r") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=32)
+def _load_csv(path_str, mtime_ns):
+    return pd.read_csv(path_str)
+
+
+@lru_cache(maxsize=32)
+def _load_csv_records(path_str, mtime_ns):
+    return _load_csv(path_str, mtime_ns).to_dict("records")
+
+
+# Known predictions.csv column types. game_id/team_id are left to inference
+# (integers, as the API has always served them to the frontend).
+PREDICTION_DTYPES = {
+    "TEAM_TOTAL_LINE": "float64",
+    "p_hat": "float64",
+    "p_hat_sigmoid": "float64",
+    "p_hat_isotonic": "float64",
+}
+
+# Columns derived from p_hat for the picks endpoint (not served by /predictions)
+PICK_COLUMNS = ["confidence", "predicted_side"]
+
+
+@lru_cache(maxsize=4)
+def _load_predictions(path_str, mtime_ns):
+    """
+    Load predictions (.parquet or .csv) into a typed DataFrame shared by all endpoints.
+
+    The date column is parsed once. The picks columns (confidence =
+    |p_hat - 0.5| and predicted_side) are written by the backtest; they are
+    only derived here for artifacts produced before that.
+    """
+    if path_str.endswith(".parquet"):
+        df = pd.read_parquet(path_str)
+    else:
+        engine = "pyarrow" if PYARROW_AVAILABLE else "c"
+        df = pd.read_csv(path_str, dtype=PREDICTION_DTYPES, engine=engine)
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], format="ISO8601", errors="coerce", cache=True)
+
+    if "confidence" in df.columns and "predicted_side" in df.columns:
+        df["predicted_side"] = df["predicted_side"].astype("category")
+    elif "p_hat" in df.columns:
+        p_hat = df["p_hat"].to_numpy()
+        df["confidence"] = np.abs(p_hat - 0.5)
+        df["predicted_side"] = pd.Categorical(np.where(p_hat >= 0.5, "OVER", "UNDER"))
+    else:
+        df["confidence"] = 0.0
+        df["predicted_side"] = "UNKNOWN"
+    return df
+
+
+def load_predictions_df():
+    """
+    Return the cached predictions DataFrame (re-read if the file changed).
+
+    Prefers predictions.parquet (typed, no CSV parsing) when pyarrow is
+    installed and the parquet file is at least as new as predictions.csv.
+    """
+    if PYARROW_AVAILABLE and (ML_ARTIFACTS_DIR / "predictions.parquet").exists():
+        parquet_key = _artifact_key("predictions.parquet")
+        csv_path = ML_ARTIFACTS_DIR / "predictions.csv"
+        if not csv_path.exists() or parquet_key[1] >= csv_path.stat().st_mtime_ns:
+            return _load_predictions(*parquet_key)
+    return _load_predictions(*_artifact_key("predictions.csv"))
+
+
+def preload_artifacts():
+    """Parse predictions and load the model ahead of the first request (called at app startup)."""
+    try:
+        load_predictions_df()
+    except HTTPException:
+        print("WARNING: predictions.csv not found; ML endpoints will 404 until it exists")
+    
+    try:
+        from backend.ml.predict import load_model
+        load_model()
+    except Exception as e:
+        print(f"WARNING: Model not preloaded ({type(e).__name__}: {e}); future games will load it on demand")
+
+
+def _make_json_safe_slow(obj):
+    """isinstance-based conversion for types without an exact-type handler."""
     if isinstance(obj, dict):
         return {k: make_json_safe(v) for k, v in obj.items()}
     elif isinstance(obj, list):
@@ -35,125 +188,195 @@ def make_json_safe(obj):
         return str(obj)
 
 
+# Exact-type handlers for the common JSON node types (one dict lookup instead
+# of walking the isinstance chain); anything else takes the slow path
+_JSON_SAFE_HANDLERS = {
+    dict: lambda obj: {k: make_json_safe(v) for k, v in obj.items()},
+    list: lambda obj: [make_json_safe(item) for item in obj],
+    str: lambda obj: obj,
+    int: lambda obj: obj,
+    float: lambda obj: None if obj != obj else obj,
+    type(None): lambda obj: None,
+    pd.Timestamp: str,
+    pd.Timedelta: str,
+}
+
+
+def make_json_safe(obj):
+    """Convert pandas/numpy types to JSON-safe Python types."""
+    handler = _JSON_SAFE_HANDLERS.get(type(obj))
+    if handler is not None:
+        return handler(obj)
+    return _make_json_safe_slow(obj)
+
+
+def _column_to_json_values(series, date_format):
+    """Convert one column to a list of JSON-safe Python values (NaN/NaT -> None)."""
+    dtype = series.dtype
+    if dtype.kind == "M":
+        values = series.dt.strftime(date_format).tolist()
+        return [None if v != v else v for v in values]
+    if dtype.kind == "m":
+        return [None if v is pd.NaT else str(v) for v in series.tolist()]
+    if isinstance(dtype, np.dtype) and dtype.kind == "f":
+        arr = series.to_numpy()
+        values = arr.tolist()
+        if np.isnan(arr).any():
+            values = [None if v != v else v for v in values]
+        return values
+    if isinstance(dtype, np.dtype) and dtype.kind in "iub":
+        return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def df_to_records(df, date_format="%Y-%m-%d %H:%M:%S"):
+    """
+    Convert a DataFrame to JSON-safe dict records, column-wise.
+
+    Each column is converted once to a list of native Python values
+    (datetimes formatted with date_format, timedeltas as strings, NaN/NaT as
+    None); rows are then zipped into dicts. This avoids both per-cell type
+    inspection and the generic DataFrame.to_dict path.
+
+    Args:
+        df: DataFrame to convert
+        date_format: strftime format for datetime columns
+
+    Returns:
+        List of dicts (one per row)
+    """
+    names = list(df.columns)
+    columns = [_column_to_json_values(df.iloc[:, i], date_format) for i in range(len(names))]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
 def get_ml_metrics():
     """Get ML metrics from metrics.json."""
-    metrics_path = ML_ARTIFACTS_DIR / "metrics.json"
-    if not metrics_path.exists():
-        raise HTTPException(status_code=404, detail="metrics.json not found")
-    
-    with open(metrics_path, "r") as f:
-        return json.load(f)
+    return _load_json(*_artifact_key("metrics.json"))
 
 
 def get_predictions(limit: int = 1000):
     """Get predictions from predictions.csv as JSON."""
-    predictions_path = ML_ARTIFACTS_DIR / "predictions.csv"
-    if not predictions_path.exists():
-        raise HTTPException(status_code=404, detail="predictions.csv not found")
-    
-    df = pd.read_csv(predictions_path)
+    df = load_predictions_df()
     
     # Limit rows
     if len(df) > limit:
         df = df.head(limit)
     
     # Convert to dict records (JSON-safe)
-    records = df.to_dict("records")
-    
-    # Convert numpy/pandas types to Python types
-    for record in records:
-        for k, v in record.items():
-            if pd.isna(v):
-                record[k] = None
-            elif isinstance(v, (pd.Timestamp, pd.Timedelta)):
-                record[k] = str(v)
-            elif isinstance(v, (int, float)):
-                if pd.api.types.is_integer_dtype(type(v)):
-                    record[k] = int(v)
-                else:
-                    record[k] = float(v)
+    records = df_to_records(df.drop(columns=PICK_COLUMNS), date_format="%Y-%m-%d")
     
     return {"predictions": records, "total": len(df), "returned": len(records)}
 
 
+def iter_predictions_ndjson(limit: int = 1000, chunk_size: int = 500):
+    """
+    Get predictions as newline-delimited JSON, serialized chunk by chunk.
+
+    The file is loaded (or a 404 raised) before streaming starts; after that
+    only chunk_size records are materialized at a time.
+
+    Args:
+        limit: Max rows to return
+        chunk_size: Rows converted per yielded chunk
+
+    Returns:
+        Generator of bytes (one JSON object per line)
+    """
+    df = load_predictions_df().head(limit).drop(columns=PICK_COLUMNS)
+
+    def generate():
+        for start in range(0, len(df), chunk_size):
+            records = df_to_records(df.iloc[start:start + chunk_size], date_format="%Y-%m-%d")
+            yield b"".join(orjson.dumps(record) + b"\n" for record in records)
+
+    return generate()
+
+
 def get_calibration():
     """Get calibration table from calibration.csv as JSON."""
-    calibration_path = ML_ARTIFACTS_DIR / "calibration.csv"
-    if not calibration_path.exists():
-        raise HTTPException(status_code=404, detail="calibration.csv not found")
-    
-    df = pd.read_csv(calibration_path)
-    return df.to_dict("records")
+    return _load_csv_records(*_artifact_key("calibration.csv"))
 
 
 def get_ablation():
     """Get ablation results from ablation_results.json."""
-    ablation_path = ML_ARTIFACTS_DIR / "ablation_results.json"
-    if not ablation_path.exists():
-        raise HTTPException(status_code=404, detail="ablation_results.json not found")
-    
-    with open(ablation_path, "r") as f:
-        return json.load(f)
+    return _load_json(*_artifact_key("ablation_results.json"))
 
 
 def get_deciles():
     """Get deciles analysis from picks_by_decile.csv as JSON."""
-    deciles_path = ML_ARTIFACTS_DIR / "picks_by_decile.csv"
-    if not deciles_path.exists():
-        raise HTTPException(status_code=404, detail="picks_by_decile.csv not found")
-    
-    df = pd.read_csv(deciles_path)
-    return df.to_dict("records")
+    return _load_csv_records(*_artifact_key("picks_by_decile.csv"))
 
 
 def get_picks_summary():
     """Get picks summary from picks_summary.json."""
-    picks_path = ML_ARTIFACTS_DIR / "picks_summary.json"
-    if not picks_path.exists():
-        raise HTTPException(status_code=404, detail="picks_summary.json not found")
-    
-    with open(picks_path, "r") as f:
-        return json.load(f)
+    return _load_json(*_artifact_key("picks_summary.json"))
 
 
 def get_coefficients():
     """Get model coefficients from coefficients.json."""
-    coefficients_path = ML_ARTIFACTS_DIR / "coefficients.json"
-    if not coefficients_path.exists():
-        raise HTTPException(status_code=404, detail="coefficients.json not found")
-    
-    with open(coefficients_path, "r") as f:
-        return json.load(f)
+    return _load_json(*_artifact_key("coefficients.json"))
 
 
 def get_timeframe():
     """Get timeframe (min/max date) from metrics.json or predictions.csv."""
     # Try metrics.json first
-    metrics_path = ML_ARTIFACTS_DIR / "metrics.json"
-    if metrics_path.exists():
-        with open(metrics_path, "r") as f:
-            metrics = json.load(f)
-            # Check if timeframe is in metrics
-            if "timeframe" in metrics:
-                return metrics["timeframe"]
-    
-    # Fall back to predictions.csv
-    predictions_path = ML_ARTIFACTS_DIR / "predictions.csv"
-    if predictions_path.exists():
-        df = pd.read_csv(predictions_path)
+    if (ML_ARTIFACTS_DIR / "metrics.json").exists():
+        metrics = _load_json(*_artifact_key("metrics.json"))
+        # Check if timeframe is in metrics
+        if "timeframe" in metrics:
+            return metrics["timeframe"]
+    
+    # Fall back to predictions (min/max skip NaT; both NaT if no valid dates)
+    if any((ML_ARTIFACTS_DIR / name).exists() for name in PREDICTION_ARTIFACTS):
+        df = load_predictions_df()
         if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-            valid_dates = df["date"].dropna()
-            if len(valid_dates) > 0:
+            min_date, max_date = df["date"].agg(["min", "max"])
+            if pd.notna(min_date):
                 return {
-                    "min_date": str(valid_dates.min().date()),
-                    "max_date": str(valid_dates.max().date()),
+                    "min_date": min_date.strftime("%Y-%m-%d"),
+                    "max_date": max_date.strftime("%Y-%m-%d"),
                     "n_samples": len(df)
                 }
     
     return {"min_date": None, "max_date": None, "n_samples": 0}
 
 
+# Sections of /api/dashboard_bundle -> (loader, artifacts it reads)
+DASHBOARD_BUNDLE_SECTIONS = {
+    "metrics": (get_ml_metrics, ("metrics.json",)),
+    "timeframe": (get_timeframe, ("metrics.json",) + PREDICTION_ARTIFACTS),
+    "calibration": (get_calibration, ("calibration.csv",)),
+    "ablation": (get_ablation, ("ablation_results.json",)),
+    "deciles": (get_deciles, ("picks_by_decile.csv",)),
+    "picks_summary": (get_picks_summary, ("picks_summary.json",)),
+    "coefficients": (get_coefficients, ("coefficients.json",)),
+}
+
+# Every artifact the bundle depends on (for its ETag)
+DASHBOARD_BUNDLE_ARTIFACTS = tuple(dict.fromkeys(
+    name for _, artifacts in DASHBOARD_BUNDLE_SECTIONS.values() for name in artifacts
+))
+
+
+def get_dashboard_bundle():
+    """
+    Get all dashboard artifacts in one response.
+    
+    Each section is the same payload as its individual endpoint; a section
+    whose artifact is missing is None instead of failing the whole bundle.
+    """
+    bundle = {}
+    for section, (loader, _) in DASHBOARD_BUNDLE_SECTIONS.items():
+        try:
+            bundle[section] = loader()
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            bundle[section] = None
+    return bundle
+
+
 def get_picks(limit=100, sort="confidence", threshold=None, topk=None):
     """
     Get example picks from predictions.csv.
@@ -164,53 +387,37 @@ def get_picks(limit=100, sort="confidence", threshold=None, topk=None):
         threshold: Filter picks where |p-0.5| >= threshold (0 to 0.5)
         topk: Return top K picks by confidence
     """
-    predictions_path = ML_ARTIFACTS_DIR / "predictions.csv"
-    if not predictions_path.exists():
-        raise HTTPException(status_code=404, detail="predictions.csv not found")
-    
-    df = pd.read_csv(predictions_path)
-    
-    # Compute confidence (distance from 0.5)
-    if "p_hat" in df.columns:
-        df["confidence"] = (df["p_hat"] - 0.5).abs()
-        df["predicted_side"] = df["p_hat"].apply(lambda p: "OVER" if p >= 0.5 else "UNDER")
-    else:
-        df["confidence"] = 0.0
-        df["predicted_side"] = "UNKNOWN"
+    # Confidence (distance from 0.5) and predicted_side are precomputed at load
+    df = load_predictions_df()
     
     # Apply threshold filter
     if threshold is not None:
         df = df[df["confidence"] >= threshold]
     
-    # Sort
+    # Take the top k rows by the sort key (partial selection, no full sort)
+    k = topk if topk is not None else limit
     if sort == "confidence":
-        df = df.sort_values("confidence", ascending=False)
+        df = df.nlargest(k, "confidence")
     elif sort == "date" and "date" in df.columns:
-        df = df.sort_values("date", ascending=False)
-    
-    # Apply topk
-    if topk is not None:
-        df = df.head(topk)
+        df = df.nlargest(k, "date")
     else:
-        df = df.head(limit)
+        df = df.head(k)
     
     # Convert to records (JSON-safe)
-    records = df.to_dict("records")
-    for record in records:
-        for k, v in record.items():
-            if pd.isna(v):
-                record[k] = None
-            elif isinstance(v, (pd.Timestamp, pd.Timedelta)):
-                record[k] = str(v)
-            elif isinstance(v, (int, float)):
-                if pd.api.types.is_integer_dtype(type(v)):
-                    record[k] = int(v)
-                else:
-                    record[k] = float(v)
+    records = df_to_records(df, date_format="%Y-%m-%d")
     
     return {"picks": records, "total": len(df), "returned": len(records)}
 
 
+def _get_history_df(load_events_df):
+    """Return load_events_df(), reusing the last result for ML_HISTORY_CACHE_TTL seconds."""
+    with _history_lock:
+        if _history_cache["ts"] is None or time.monotonic() - _history_cache["ts"] > ML_HISTORY_CACHE_TTL:
+            _history_cache["df"] = load_events_df()
+            _history_cache["ts"] = time.monotonic()
+        return _history_cache["df"]
+
+
 def get_future_games(date_from=None, date_to=None, min_confidence=0.0, limit=100):
     """
     Get future games with predictions.
@@ -230,7 +437,7 @@ def get_future_games(date_from=None, date_to=None, min_confidence=0.0, limit=100
     """
     try:
         from app.db import db
-        from backend.ml.predict import predict_future_games
+        from backend.ml.predict import predict_future_games, load_model
         from backend.ml.data import load_events_df
     except ImportError as e:
         raise HTTPException(status_code=503, detail=f"ML prediction module not available: {e}")
@@ -262,7 +469,13 @@ def get_future_games(date_from=None, date_to=None, min_confidence=0.0, limit=100
                     query["GAME_DATE"] = {}
                 query["GAME_DATE"]["$lte"] = datetime.strptime(date_to, "%Y-%m-%d")
             
-            games_cursor = db.games.find(query).limit(limit * 2)  # Get extra for filtering
+            projection = {field: 1 for field in FUTURE_GAME_FIELDS}
+            projection["_id"] = 0
+            games_cursor = (
+                db.games.find(query, projection)
+                .sort("GAME_DATE", 1)
+                .limit(limit * 2)  # Get extra for filtering
+            )
             games_list = list(games_cursor)
             
             if games_list:
@@ -271,7 +484,7 @@ def get_future_games(date_from=None, date_to=None, min_confidence=0.0, limit=100
                 
                 # Convert GAME_DATE to date column
                 if "GAME_DATE" in df_future.columns:
-                    df_future["date"] = pd.to_datetime(df_future["GAME_DATE"], errors="coerce")
+                    df_future["date"] = pd.to_datetime(df_future["GAME_DATE"], format="ISO8601", errors="coerce", cache=True)
                 
                 # Ensure required columns exist
                 if "GAME_ID" in df_future.columns:
@@ -301,7 +514,7 @@ def get_future_games(date_from=None, date_to=None, min_confidence=0.0, limit=100
     
     # Load historical data for rolling features
     try:
-        df_history = load_events_df()
+        df_history = _get_history_df(load_events_df)
         print(f"Loaded {len(df_history)} historical events for rolling features")
     except Exception as e:
         print(f"WARNING: Could not load history: {e}. Rolling features will be NaNs.")
@@ -309,35 +522,29 @@ def get_future_games(date_from=None, date_to=None, min_confidence=0.0, limit=100
     
     # Generate predictions
     try:
-        results = predict_future_games(df_future, df_history=df_history)
+        # load_model() is cached per model.joblib version
+        results = predict_future_games(df_future, df_history=df_history, model=load_model())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
     
-    # Apply filters
+    # Order by date (stable), then cut the date range with binary search
+    results = results.sort_values("date", kind="stable")
+    if date_from or date_to:
+        dates = results["date"].to_numpy()
+        lo = np.searchsorted(dates, pd.Timestamp(date_from).to_datetime64(), side="left") if date_from else 0
+        # Missing dates sort last; exclude them like the comparison filters would
+        hi = np.searchsorted(dates, pd.Timestamp(date_to).to_datetime64(), side="right") if date_to else results["date"].notna().sum()
+        results = results.iloc[lo:hi]
+    
+    # Apply confidence filter
     if min_confidence > 0:
         results = results[results["confidence"] >= min_confidence]
     
-    if date_from:
-        results = results[results["date"] >= pd.to_datetime(date_from)]
-    if date_to:
-        results = results[results["date"] <= pd.to_datetime(date_to)]
-    
     # Limit results
     results = results.head(limit)
     
-    # Convert to JSON-safe records
-    records = results.to_dict("records")
-    for record in records:
-        for k, v in record.items():
-            if pd.isna(v):
-                record[k] = None
-            elif isinstance(v, (pd.Timestamp, pd.Timedelta)):
-                record[k] = str(v.date()) if isinstance(v, pd.Timestamp) else str(v)
-            elif isinstance(v, (int, float)):
-                if pd.api.types.is_integer_dtype(type(v)):
-                    record[k] = int(v)
-                else:
-                    record[k] = float(v)
+    # Convert to JSON-safe records (dates as YYYY-MM-DD)
+    records = df_to_records(results, date_format="%Y-%m-%d")
     
     return {
         "games": records,
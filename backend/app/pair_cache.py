@@ -0,0 +1,74 @@
+"""
+In-memory column cache of the pair_stats collection.
+
+The pairs endpoints in main.py all scan pair_stats in full. Instead of
+re-reading and decoding the collection on every request, they share one
+snapshot that is refreshed every PAIR_CACHE_TTL seconds. The snapshot keeps
+the raw documents (for building responses) plus one NumPy array per numeric
+field so filtering, scoring and ranking are vectorized.
+"""
+import os
+import threading
+import time
+import numpy as np
+from app.db import db
+
+PAIR_CACHE_TTL = float(os.getenv("PAIR_CACHE_TTL", "30"))
+
+# Numeric pair_stats fields -> (dtype, value used when the field is missing).
+# Optional CI fields use NaN so comparisons on missing values are False.
+PAIR_COLUMNS = {
+    "n": (np.int64, 0),
+    "lift": (np.float64, 0.0),
+    "phi": (np.float64, 0.0),
+    "pA": (np.float64, 0.0),
+    "pB": (np.float64, 0.0),
+    "pAB": (np.float64, 0.0),
+    "lift_lo": (np.float64, np.nan),
+    "lift_hi": (np.float64, np.nan),
+    "phi_lo": (np.float64, np.nan),
+    "phi_hi": (np.float64, np.nan),
+    "pBA_mean": (np.float64, np.nan),
+    "pBA_lo": (np.float64, np.nan),
+    "pBA_hi": (np.float64, np.nan),
+}
+
+
+class PairCache:
+    """Snapshot of pair_stats as a list of docs plus a dict of column arrays."""
+
+    def __init__(self, ttl=PAIR_CACHE_TTL):
+        self.ttl = ttl
+        self.ts = None
+        self.docs = []
+        self.arrays = {}
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return (docs, arrays), re-reading pair_stats if the snapshot is stale."""
+        with self._lock:
+            if self.ts is None or time.monotonic() - self.ts > self.ttl:
+                self._refresh()
+            return self.docs, self.arrays
+
+    def _refresh(self):
+        docs = list(db.pair_stats.find({}, {"_id": 0}))
+        count = len(docs)
+
+        arrays = {}
+        for field, (dtype, default) in PAIR_COLUMNS.items():
+            values = (doc.get(field) for doc in docs)
+            arrays[field] = np.fromiter(
+                (default if v is None else v for v in values), dtype=dtype, count=count
+            )
+
+        # log10(n) is shared by every score; 0 for n <= 1
+        n = arrays["n"].astype(np.float64)
+        arrays["log_n"] = np.log10(n, out=np.zeros_like(n), where=n > 1)
+
+        self.docs = docs
+        self.arrays = arrays
+        self.ts = time.monotonic()
+
+
+pair_cache = PairCache()
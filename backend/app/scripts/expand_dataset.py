@@ -13,6 +13,8 @@ Usage:
 """
 import sys
 import argparse
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 # Add backend to path
@@ -20,26 +22,28 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.db import db
 from app.etl.pull_games import pull_games
-from app.etl.pull_boxscores import pull_boxscore_traditional, game_already_exists, get_unique_game_ids
+from app.etl.pull_boxscores import fetch_boxscore_traditional, replace_boxscores, get_existing_game_ids, get_unique_game_ids
 from app.analytics.refresh_all import (
     build_team_stats_for_all_games,
     refresh_roles_for_all_games,
     refresh_events_for_all_games,
 )
 from app.features.context_tags import add_context_tags_to_events
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import time
 
 
+@lru_cache(maxsize=8)
 def get_recent_seasons(n_years=7):
-    """Generate list of recent NBA seasons."""
-    from datetime import datetime
+    """Generate recent NBA seasons (cached; returned as a tuple so it can't be mutated)."""
     current_year = datetime.now().year
     seasons = []
     for i in range(n_years):
         year = current_year - i
         season = f"{year-1}-{str(year)[-2:]}"
         seasons.append(season)
-    return seasons
+    return tuple(seasons)
 
 
 def pull_games_for_seasons(seasons, season_type="Regular Season"):
@@ -70,8 +74,40 @@ def pull_games_for_seasons(seasons, season_type="Regular Season"):
     return final_count
 
 
-def pull_boxscores_for_all_games(limit=None, sleep_seconds=1.2):
-    """Pull boxscores for all games in database."""
+class RateLimiter:
+    """Space out request starts across threads: at most one every `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Player rows buffered before a bulk write to player_game_stats
+BOXSCORE_BATCH_SIZE = 500
+
+
+def pull_boxscores_for_all_games(limit=None, sleep_seconds=1.2, workers=4):
+    """
+    Pull boxscores for all games in database.
+    
+    Requests run on a small thread pool so slow responses overlap, while the
+    rate limiter still starts at most one request every `sleep_seconds`.
+    Parsed rows are buffered and written in bulk (BOXSCORE_BATCH_SIZE rows).
+    
+    Args:
+        limit: Max number of games (None = all)
+        sleep_seconds: Minimum seconds between request starts
+        workers: Max requests in flight
+    """
     print(f"\n{'='*80}")
     print("STEP 2: Pulling boxscores from NBA API")
     print(f"{'='*80}")
@@ -85,13 +121,9 @@ def pull_boxscores_for_all_games(limit=None, sleep_seconds=1.2):
     print(f"Found {len(game_ids)} games to process")
     
     # Filter existing
-    filtered_ids = []
-    skipped = 0
-    for gid in game_ids:
-        if game_already_exists(gid):
-            skipped += 1
-        else:
-            filtered_ids.append(gid)
+    existing_ids = get_existing_game_ids()
+    filtered_ids = [gid for gid in game_ids if gid not in existing_ids]
+    skipped = len(game_ids) - len(filtered_ids)
     
     if skipped > 0:
         print(f"Skipping {skipped} games that already have boxscores")
@@ -99,18 +131,33 @@ def pull_boxscores_for_all_games(limit=None, sleep_seconds=1.2):
     
     total_players = 0
     failed = 0
+    limiter = RateLimiter(sleep_seconds)
+    buffer_ids = []
+    buffer_docs = []
     
-    for i, gid in enumerate(filtered_ids, 1):
-        success, count = pull_boxscore_traditional(gid)
-        if success:
-            total_players += count
-            if i % 50 == 0:
-                print(f"  Progress: {i}/{len(filtered_ids)} ({i*100//len(filtered_ids)}%)")
-        else:
-            failed += 1
-        
-        if i < len(filtered_ids):
-            time.sleep(sleep_seconds)
+    def fetch(gid):
+        limiter.wait()
+        return gid, fetch_boxscore_traditional(gid)
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fetch, gid) for gid in filtered_ids]
+        for i, future in enumerate(as_completed(futures), 1):
+            gid, (success, docs) = future.result()
+            if success:
+                total_players += len(docs)
+                if docs:
+                    buffer_ids.append(gid)
+                    buffer_docs.extend(docs)
+                if len(buffer_docs) >= BOXSCORE_BATCH_SIZE:
+                    replace_boxscores(buffer_ids, buffer_docs)
+                    buffer_ids, buffer_docs = [], []
+                if i % 50 == 0:
+                    print(f"  Progress: {i}/{len(filtered_ids)} ({i*100//len(filtered_ids)}%)")
+            else:
+                failed += 1
+    
+    # Flush remaining rows
+    replace_boxscores(buffer_ids, buffer_docs)
     
     print(f"\n✓ Inserted {total_players} player rows")
     if failed > 0:
@@ -159,7 +206,8 @@ def main():
     parser.add_argument("--skip-games", action="store_true", help="Skip pulling games")
     parser.add_argument("--skip-boxscores", action="store_true", help="Skip pulling boxscores")
     parser.add_argument("--skip-analytics", action="store_true", help="Skip building analytics")
-    parser.add_argument("--sleep-boxscores", type=float, default=1.2, help="Sleep between boxscore requests (default: 1.2)")
+    parser.add_argument("--sleep-boxscores", type=float, default=1.2, help="Min seconds between boxscore request starts (default: 1.2)")
+    parser.add_argument("--boxscore-workers", type=int, default=4, help="Concurrent boxscore requests (default: 4)")
     
     args = parser.parse_args()
     
@@ -170,7 +218,7 @@ def main():
         # Calculate seasons needed (~1230 games per season)
         games_per_season = 1230
         n_seasons = max(1, (args.target_games + games_per_season - 1) // games_per_season)
-        seasons = get_recent_seasons(n_years=min(n_seasons, 7))
+        seasons = list(get_recent_seasons(n_years=min(n_seasons, 7)))
         print(f"Auto-calculated {len(seasons)} seasons for ~{args.target_games} games: {seasons}")
     
     print(f"\n{'='*80}")
@@ -188,7 +236,7 @@ def main():
     
     # Step 2: Pull boxscores
     if not args.skip_boxscores:
-        pull_boxscores_for_all_games(limit=None, sleep_seconds=args.sleep_boxscores)
+        pull_boxscores_for_all_games(limit=None, sleep_seconds=args.sleep_boxscores, workers=args.boxscore_workers)
     else:
         print("\nSkipping boxscore pull (--skip-boxscores)")
     
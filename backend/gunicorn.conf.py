@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration for running the API in production.
+
+Usage (from the project root, like the dev server and the ML CLI, so relative
+artifact paths such as backend/ml/artifacts resolve):
+    gunicorn app.main:app -c backend/gunicorn.conf.py
+
+Each worker is a UvicornWorker (uvloop event loop + httptools parser), so the
+CPU-bound request handling in main.py fans out across cores instead of being
+capped by a single process's GIL.
+"""
+import multiprocessing
+import os
+from pathlib import Path
+
+# The app is imported as `app.*`, so backend/ must be importable (same as
+# PYTHONPATH=./backend for the dev server); `backend.ml.*` resolves from the root
+pythonpath = str(Path(__file__).resolve().parent)
+
+bind = os.getenv("API_BIND", "0.0.0.0:8000")
+
+# Default to the usual (2 * cores) + 1 heuristic
+workers = int(os.getenv("API_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+# uvicorn.workers is deprecated in uvicorn itself; the worker class now ships
+# in the uvicorn-worker package
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Keep preload_app off: app.db creates its MongoClient at import time, and
+# PyMongo clients are not fork-safe. Importing the app inside each worker
+# gives every worker its own connection pool.
+preload_app = False
+
+timeout = int(os.getenv("API_TIMEOUT", "60"))
+keepalive = 5
@@ -1,11 +1,12 @@
 """
 Ablation study: Evaluate different feature sets.
 """
+import traceback
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
-from .config import MIN_TRAIN_SIZE, TEST_CHUNK_SIZE
-from .backtest import walk_forward_backtest
+from .config import MIN_TRAIN_SIZE, TEST_CHUNK_SIZE, DEBUG_FOLDS
+from .backtest import walk_forward_backtest_multi
 
 
 def get_feature_set_A_line_only(df, feature_cols_all):
@@ -34,9 +35,8 @@ def get_feature_set_B_line_plus_context(df, feature_cols_all):
     
     # Add context features
     context_features = ["is_home", "is_competitive", "pace_low", "pace_mid", "pace_high"]
-    for feat in context_features:
-        if feat in feature_cols_all:
-            feature_set.append(feat)
+    all_set = set(feature_cols_all)
+    feature_set += [feat for feat in context_features if feat in all_set]
     
     return feature_set
 
@@ -54,20 +54,14 @@ def get_feature_set_C_line_plus_rolling_totals(df, feature_cols_all):
     feature_set = get_feature_set_A_line_only(df, feature_cols_all)
     
     # Add rolling features from TEAM_TOTAL and GAME_TOTAL only
-    rolling_prefixes = [
+    # (str.startswith with a tuple checks all prefixes in one call)
+    rolling_prefixes = (
         "rolling_TEAM_TOTAL",
         "rolling_team_total",
         "rolling_GAME_TOTAL",
         "rolling_game_total",
-    ]
-    
-    for feat in feature_cols_all:
-        if feat.startswith("rolling_"):
-            # Check if it's from TEAM_TOTAL or GAME_TOTAL
-            for prefix in rolling_prefixes:
-                if feat.startswith(prefix):
-                    feature_set.append(feat)
-                    break
+    )
+    feature_set += [feat for feat in feature_cols_all if feat.startswith(rolling_prefixes)]
     
     return feature_set
 
@@ -80,7 +74,17 @@ def get_feature_set_D_full_model(df, feature_cols_all):
     return feature_cols_all.copy()
 
 
-def run_ablation_study(df_final, label_col, feature_cols_all):
+# Feature set name -> column selector (ablation order; names are the keys used
+# in the ablation results)
+FEATURE_SET_REGISTRY = {
+    "A: line_only": get_feature_set_A_line_only,
+    "B: line_plus_context": get_feature_set_B_line_plus_context,
+    "C: line_plus_rolling_totals": get_feature_set_C_line_plus_rolling_totals,
+    "D: full_model": get_feature_set_D_full_model,
+}
+
+
+def run_ablation_study(df_final, label_col, feature_cols_all, warm_start=None, n_jobs=None, assume_sorted=False, debug_folds=None):
     """
     Run ablation study with 4 feature sets.
     Each evaluated with uncalibrated and sigmoid-calibrated models.
@@ -89,6 +93,10 @@ def run_ablation_study(df_final, label_col, feature_cols_all):
         df_final: DataFrame with all features, label, and metadata
         label_col: Label column name
         feature_cols_all: List of all available feature columns
+        warm_start: Warm-start folds from the previous fold (defaults to config)
+        n_jobs: Parallel workers over (fold, feature set) tasks (defaults to config)
+        assume_sorted: df_final is already sorted by date (skip the backtest's sort)
+        debug_folds: Print full tracebacks for failures (defaults to config)
         
     Returns:
         List of results dicts with metrics for each feature set + calibration variant
@@ -99,77 +107,77 @@ def run_ablation_study(df_final, label_col, feature_cols_all):
     
     # Define feature sets
     feature_sets = {
-        "A: line_only": get_feature_set_A_line_only(df_final, feature_cols_all),
-        "B: line_plus_context": get_feature_set_B_line_plus_context(df_final, feature_cols_all),
-        "C: line_plus_rolling_totals": get_feature_set_C_line_plus_rolling_totals(df_final, feature_cols_all),
-        "D: full_model": get_feature_set_D_full_model(df_final, feature_cols_all),
+        set_name: get_feature_set(df_final, feature_cols_all)
+        for set_name, get_feature_set in FEATURE_SET_REGISTRY.items()
     }
     
     results = []
+    df_cols_set = set(df_final.columns)
     
-    # Evaluate each feature set
+    active_sets = {}
     for set_name, feature_cols in feature_sets.items():
         if not feature_cols:
             print(f"\n  Skipping {set_name}: no features")
             continue
-        
         print(f"\n  Evaluating {set_name} ({len(feature_cols)} features)...")
+        active_sets[set_name] = feature_cols
+    
+    # One backtest pass over the union of the set columns + label + metadata;
+    # sorting, fold boundaries and baselines are shared across feature sets.
+    # dict.fromkeys dedupes (TEAM_TOTAL_LINE is both a feature and metadata) in order.
+    metadata_cols = [label_col, "date", "team_id", "game_id", "TEAM_TOTAL_LINE"]
+    cols_needed = [c for cols in active_sets.values() for c in cols] + metadata_cols
+    cols_unique = [c for c in dict.fromkeys(cols_needed) if c in df_cols_set]
+    
+    try:
+        backtest_results = walk_forward_backtest_multi(
+            df_final[cols_unique],
+            active_sets,
+            label_col,
+            min_train_size=MIN_TRAIN_SIZE,
+            test_chunk_size=TEST_CHUNK_SIZE,
+            warm_start=warm_start,
+            n_jobs=n_jobs,
+            assume_sorted=assume_sorted,
+            debug_folds=debug_folds,
+        )
+    except Exception as e:
+        print(f"    ERROR: {e!r}")
+        if DEBUG_FOLDS if debug_folds is None else debug_folds:
+            traceback.print_exc()
+        backtest_results = {}
+    
+    for set_name, feature_cols in active_sets.items():
+        if set_name not in backtest_results:
+            continue
+        _, metrics_dict, _ = backtest_results[set_name]
         
-        # Filter df_final to only include these features + label + metadata
-        # Ensure no duplicates (TEAM_TOTAL_LINE might be in both feature_cols and metadata list)
-        metadata_cols = [label_col, "date", "team_id", "game_id", "TEAM_TOTAL_LINE"]
-        cols_needed = feature_cols + [c for c in metadata_cols if c not in feature_cols]
-        cols_available = [c for c in cols_needed if c in df_final.columns]
-        # Remove any remaining duplicates while preserving order
-        seen = set()
-        cols_unique = []
-        for c in cols_available:
-            if c not in seen:
-                seen.add(c)
-                cols_unique.append(c)
-        df_filtered = df_final[cols_unique].copy()
+        # Extract metrics for uncalibrated and sigmoid
+        selected_model = metrics_dict.get("selected_model", "uncalibrated")
+        selected_metrics = metrics_dict.get("selected_model_metrics", metrics_dict)
         
-        # Run backtest with this feature set
-        try:
-            _, metrics_dict, _ = walk_forward_backtest(
-                df_filtered,
-                feature_cols,
-                label_col,
-                min_train_size=MIN_TRAIN_SIZE,
-                test_chunk_size=TEST_CHUNK_SIZE,
-            )
-            
-            # Extract metrics for uncalibrated and sigmoid
-            selected_model = metrics_dict.get("selected_model", "uncalibrated")
-            selected_metrics = metrics_dict.get("selected_model_metrics", metrics_dict)
-            
-            # Get sigmoid metrics if available
-            sigmoid_metrics = metrics_dict.get("calibrated_sigmoid", {})
-            if not sigmoid_metrics:
-                sigmoid_metrics = selected_metrics  # Fallback
-            
-            results.append({
-                "feature_set": set_name,
-                "n_features": len(feature_cols),
-                "variant": "uncalibrated",
-                "accuracy": metrics_dict.get("accuracy", 0),
-                "log_loss": metrics_dict.get("log_loss", float('inf')),
-                "roc_auc": metrics_dict.get("roc_auc"),
-            })
-            
-            results.append({
-                "feature_set": set_name,
-                "n_features": len(feature_cols),
-                "variant": "sigmoid",
-                "accuracy": sigmoid_metrics.get("accuracy", 0),
-                "log_loss": sigmoid_metrics.get("log_loss", float('inf')),
-                "roc_auc": sigmoid_metrics.get("roc_auc"),
-            })
-            
-        except Exception as e:
-            print(f"    ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+        # Get sigmoid metrics if available
+        sigmoid_metrics = metrics_dict.get("calibrated_sigmoid", {})
+        if not sigmoid_metrics:
+            sigmoid_metrics = selected_metrics  # Fallback
+        
+        results.append({
+            "feature_set": set_name,
+            "n_features": len(feature_cols),
+            "variant": "uncalibrated",
+            "accuracy": metrics_dict.get("accuracy", 0),
+            "log_loss": metrics_dict.get("log_loss", float('inf')),
+            "roc_auc": metrics_dict.get("roc_auc"),
+        })
+        
+        results.append({
+            "feature_set": set_name,
+            "n_features": len(feature_cols),
+            "variant": "sigmoid",
+            "accuracy": sigmoid_metrics.get("accuracy", 0),
+            "log_loss": sigmoid_metrics.get("log_loss", float('inf')),
+            "roc_auc": sigmoid_metrics.get("roc_auc"),
+        })
     
     # Print comparison table
     print("\n" + "=" * 80)
@@ -1,15 +1,17 @@
 """
 Walk-forward backtest with expanding window.
 """
+import traceback
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Tuple
-from .config import MIN_TRAIN_SIZE, TEST_CHUNK_SIZE
-from .train import train_model, predict_proba, train_calibrated_model
-from .metrics import compute_all_metrics
+from joblib import Parallel, delayed
+from .config import MIN_TRAIN_SIZE, TEST_CHUNK_SIZE, WARM_START, BACKTEST_N_JOBS, DEBUG_FOLDS
+from .train import train_model, predict_proba, ProbabilityCalibrator, fit_predict_logistic_newton
+from .metrics import compute_all_metrics, compute_all_metrics_batch
 
 
-def walk_forward_backtest(df, feature_cols, label_col, min_train_size=None, test_chunk_size=None):
+def walk_forward_backtest(df, feature_cols, label_col, min_train_size=None, test_chunk_size=None, warm_start=None, n_jobs=None, assume_sorted=False, debug_folds=None, return_last_classifier=False):
     """
     Run walk-forward backtest with expanding window.
     
@@ -19,22 +21,87 @@ def walk_forward_backtest(df, feature_cols, label_col, min_train_size=None, test
         label_col: Column name for label
         min_train_size: Minimum training set size (defaults to config)
         test_chunk_size: Test chunk size in rows (defaults to config)
+        warm_start: Start each fold's fit from the previous fold's coefficients (defaults to config)
+        n_jobs: Folds to run in parallel (defaults to config; anything but 1 disables warm start)
+        assume_sorted: df is already sorted by date with a RangeIndex (skip the sort)
+        debug_folds: Print full tracebacks for failed folds (defaults to config)
+        return_last_classifier: Also return the last completed fold's fitted
+            LogisticRegression (e.g. as a warm start for a full-data refit)
         
     Returns:
-        Tuple of (predictions_df, metrics_dict, calibration_df)
+        Tuple of (predictions_df, metrics_dict, calibration_df), plus the last
+        fold's classifier if return_last_classifier
+    """
+    results = walk_forward_backtest_multi(
+        df,
+        {None: feature_cols},
+        label_col,
+        min_train_size=min_train_size,
+        test_chunk_size=test_chunk_size,
+        warm_start=warm_start,
+        n_jobs=n_jobs,
+        assume_sorted=assume_sorted,
+        debug_folds=debug_folds,
+        return_last_classifier=return_last_classifier,
+    )
+    if None not in results:
+        raise ValueError("No valid folds completed")
+    return results[None]
+
+
+def _line_baseline_cols(feature_cols):
+    """Task 5: Line-only baseline columns (TEAM_TOTAL_LINE, GAME_TOTAL_LINE if available)."""
+    feature_cols = set(feature_cols)
+    return tuple(c for c in ("TEAM_TOTAL_LINE", "GAME_TOTAL_LINE") if c in feature_cols)
+
+
+def walk_forward_backtest_multi(df, feature_sets, label_col, min_train_size=None, test_chunk_size=None, warm_start=None, n_jobs=None, assume_sorted=False, debug_folds=None, return_last_classifier=False):
+    """
+    Run the walk-forward backtest for several feature sets in one pass.
+    
+    Sorting, fold boundaries, the train_fit/train_cal split and the baselines
+    are computed once and shared; each feature set trains its own model on
+    its column subset, so per-set results match separate backtest runs.
+    
+    Args:
+        df: DataFrame with the union of all feature columns, label and metadata
+        feature_sets: Dict of set name -> list of feature column names
+        label_col: Column name for label
+        min_train_size: Minimum training set size (defaults to config)
+        test_chunk_size: Test chunk size in rows (defaults to config)
+        warm_start: Start each fold's fit from the previous fold's coefficients (defaults to config)
+        n_jobs: Parallel workers over (fold, feature set) tasks (defaults to config; anything but 1 disables warm start)
+        assume_sorted: df is already sorted by date with a RangeIndex (skip the sort)
+        debug_folds: Print full tracebacks for failed folds (defaults to config)
+        return_last_classifier: Append each set's last completed fold classifier to its tuple
+        
+    Returns:
+        Dict of set name -> (predictions_df, metrics_dict, calibration_df), plus
+        the last fold's classifier if return_last_classifier.
+        Sets where no fold completed are omitted.
     """
     if min_train_size is None:
         min_train_size = MIN_TRAIN_SIZE
     if test_chunk_size is None:
         test_chunk_size = TEST_CHUNK_SIZE
+    if warm_start is None:
+        warm_start = WARM_START
+    if n_jobs is None:
+        n_jobs = BACKTEST_N_JOBS
+    if debug_folds is None:
+        debug_folds = DEBUG_FOLDS
     
     print(f"\nWalk-forward backtest:")
     print(f"  Min train size: {min_train_size}")
     print(f"  Test chunk size: {test_chunk_size}")
     print(f"  Total rows: {len(df)}")
+    print(f"  Warm start: {warm_start}")
+    if len(feature_sets) > 1:
+        print(f"  Feature sets: {len(feature_sets)}")
     
-    # Ensure df is sorted by date
-    df = df.sort_values("date").reset_index(drop=True)
+    # Ensure df is sorted by date (callers that pre-sort once pass assume_sorted)
+    if not assume_sorted:
+        df = df.sort_values("date", kind="mergesort").reset_index(drop=True)
     
     # Adjust min_train_size if dataset is too small
     # Use 80% of data for training minimum if dataset < min_train_size
@@ -43,29 +110,21 @@ def walk_forward_backtest(df, feature_cols, label_col, min_train_size=None, test
         print(f"  WARNING: Dataset has {len(df)} rows < {min_train_size}, adjusting min_train_size to {adjusted_min_train_size}")
         min_train_size = adjusted_min_train_size
     
-    # Extract feature matrix and labels
-    X = df[feature_cols].copy()
-    y = df[label_col].copy()
-    meta = df[["date", "team_id", "game_id", "TEAM_TOTAL_LINE"]].copy() if all(c in df.columns for c in ["date", "team_id", "game_id", "TEAM_TOTAL_LINE"]) else df[["date"]].copy()
-    
-    # Store all predictions
-    all_predictions = []
-    all_y_true = []
-    all_y_pred_proba = []
-    fold_metrics = []
-    
-    # Task 5: Store baseline predictions
-    all_baseline_05_proba = []
-    all_baseline_line_proba = []
-    
-    # Task 2: Store calibrated predictions
-    all_y_pred_proba_sigmoid = []
-    all_y_pred_proba_isotonic = []
+    # Extract labels and metadata (column selection already returns new frames).
+    # Labels become a NumPy array once, int8 for binary integer/bool labels, so
+    # fold slices below are zero-copy views.
+    y = df[label_col].to_numpy()
+    if y.dtype.kind in "biu":
+        y = y.astype(np.int8, copy=False)
+    meta = df[["date", "team_id", "game_id", "TEAM_TOTAL_LINE"]] if all(c in df.columns for c in ["date", "team_id", "game_id", "TEAM_TOTAL_LINE"]) else df[["date"]]
+    # IDs repeat across rows; category codes keep the meta gather and the
+    # predictions frame small (to_csv/to_parquet write the original values)
+    if "team_id" in meta.columns:
+        meta = meta.astype({"team_id": "category", "game_id": "category"})
     
     # Walk-forward: expanding window
     train_start = 0
     test_start = min_train_size
-    fold = 0
     
     # If we still don't have enough data, use single train/test split
     if test_start >= len(df):
@@ -74,85 +133,251 @@ def walk_forward_backtest(df, feature_cols, label_col, min_train_size=None, test
         print(f"  WARNING: Dataset too small for multiple folds, using single 80/20 split (train={split_idx}, test={len(df)-split_idx})")
         test_start = split_idx
     
-    while test_start < len(df):
-        test_end = min(test_start + test_chunk_size, len(df))
-        
-        # Training set: all data up to test_start
-        train_indices = range(train_start, test_start)
-        test_indices = range(test_start, test_end)
-        
-        X_train = X.iloc[train_indices].copy()
-        y_train = y.iloc[train_indices].copy()
-        X_test = X.iloc[test_indices].copy()
-        y_test = y.iloc[test_indices].copy()
-        meta_test = meta.iloc[test_indices].copy()
+    # Enumerate fold boundaries up front: (fold, train_start, test_start, test_end).
+    # Test chunks start every test_chunk_size rows; a chunk whose training window
+    # is too small (only possible after the 80/20 fallback) is skipped.
+    n_rows = len(df)
+    test_starts = range(test_start, n_rows, test_chunk_size)
+    for ts in test_starts:
+        if ts - train_start < min_train_size:
+            print(f"  Skipping test chunk at {ts} (train size {ts - train_start} < {min_train_size})")
+    fold_bounds = [
+        (fold, train_start, ts, min(ts + test_chunk_size, n_rows))
+        for fold, ts in enumerate(ts for ts in test_starts if ts - train_start >= min_train_size)
+    ]
+    print(f"  Running {len(fold_bounds)} folds")
+    
+    if n_jobs != 1 and warm_start:
+        print("  Parallel folds requested; disabling warm start")
+        warm_start = False
+    
+    # Feature matrix for the union of all sets, with numeric columns cast once to
+    # float64 (the training pipeline drops anything non-numeric anyway). Stored
+    # int8/float32 columns would otherwise make the imputer/scaler output float32,
+    # and lbfgs upcasts to float64 internally, so float32 saves nothing in the fit
+    feature_union = list(dict.fromkeys(c for cols in feature_sets.values() for c in cols))
+    features = df[feature_union]
+    numeric_cols = features.select_dtypes(include=[np.number]).columns
+    features = features.astype({c: np.float64 for c in numeric_cols})
+    
+    # Resolve column names to positions once; per-set frames are positional takes.
+    # The line-only baseline works on a plain float matrix, so each distinct
+    # line-column subset is materialized once as NumPy (fold slices are views).
+    col_pos = {c: i for i, c in enumerate(feature_union)}
+    numeric_set = set(numeric_cols)
+    line_matrices = {}
+    for feature_cols in feature_sets.values():
+        line_cols = _line_baseline_cols(c for c in feature_cols if c in numeric_set)
+        if line_cols and line_cols not in line_matrices:
+            line_idx = np.array([col_pos[c] for c in line_cols], dtype=np.intp)
+            line_matrices[line_cols] = features.iloc[:, line_idx].to_numpy(dtype=np.float64)
+    
+    # Per-set state. Out-of-fold arrays are preallocated for every test row and
+    # filled by slice per fold (truncated to `offset` if a fold fails)
+    n_pred = sum(test_end - test_start for _, _, test_start, test_end in fold_bounds)
+    states = {}
+    for set_name, feature_cols in feature_sets.items():
+        states[set_name] = {
+            "X": features.iloc[:, np.array([col_pos[c] for c in feature_cols], dtype=np.intp)],
+            "line_cols": _line_baseline_cols(c for c in feature_cols if c in numeric_set),
+            "fold_metrics": [],
+            # Positional row (into the sorted df) and fold number of each prediction
+            "rows": np.empty(n_pred, dtype=np.intp),
+            "fold_ids": np.empty(n_pred, dtype=np.int32),
+            "y_true": np.empty(n_pred, dtype=y.dtype),
+            "p_hat": np.empty(n_pred, dtype=np.float64),
+            # Task 2: Calibrated predictions
+            "p_hat_sigmoid": np.empty(n_pred, dtype=np.float64),
+            "p_hat_isotonic": np.empty(n_pred, dtype=np.float64),
+            # Task 5: Baseline predictions (baseline A is constant, so it is filled once)
+            "baseline_05": np.full(n_pred, 0.5),
+            "baseline_line": np.empty(n_pred, dtype=np.float64),
+            "offset": 0,
+            "last_classifier": None,
+        }
+    
+    set_inputs = {
+        name: (state["X"], state["line_cols"], line_matrices.get(state["line_cols"]))
+        for name, state in states.items()
+    }
+    
+    if n_jobs == 1:
+        # Serial: each fold's training window is a superset of the previous one,
+        # so (with warm start) its coefficients are a close starting point
+        fold_results = []
+        prev_classifiers = {}
+        for bounds in fold_bounds:
+            result = _run_fold(*bounds, y, set_inputs, prev_classifiers, debug=debug_folds)
+            fold_results.append(result)
+            if warm_start:
+                prev_classifiers = {name: r["classifier"] for name, r in result.items() if "error" not in r}
+    else:
+        # Folds are independent without warm start, and so are the feature sets
+        # within a fold: dispatch one (fold, set) task each so the large sets
+        # don't serialize a whole fold on one core. Each task ships only its own
+        # set's inputs (joblib memmaps the large arrays instead of copying them).
+        tasks = [(i, set_name) for i in range(len(fold_bounds)) for set_name in set_inputs]
+        task_results = Parallel(n_jobs=n_jobs, backend="loky", batch_size=1)(
+            delayed(_run_fold)(*fold_bounds[i], y, {set_name: set_inputs[set_name]}, debug=debug_folds)
+            for i, set_name in tasks
+        )
+        fold_results = [{} for _ in fold_bounds]
+        for (i, _), result in zip(tasks, task_results):
+            fold_results[i].update(result)
+    
+    # Collect fold results in fold order; failures are summarized once at the end
+    failed_folds = []
+    for (fold, train_start, test_start, test_end), result in zip(fold_bounds, fold_results):
+        print(f"  Fold {fold}: train=[{train_start}:{test_start}] ({test_start - train_start} rows), test=[{test_start}:{test_end}] ({test_end - test_start} rows)")
+        y_test = y[test_start:test_end]
         
-        if len(X_train) < min_train_size:
-            print(f"  Fold {fold}: Skipping (train size {len(X_train)} < {min_train_size})")
-            test_start = test_end
+        for set_name, state in states.items():
+            if set_name is not None:
+                print(f"    [{set_name}]")
+            r = result[set_name]
+            if "error" in r:
+                print(f"    ERROR in fold {fold}: {r['error']}")
+                failed_folds.append((set_name, fold, r["error"]))
+                continue
+            
+            fold_metrics_dict = r["fold_metrics"]
+            state["fold_metrics"].append(fold_metrics_dict)
+            print(f"    Accuracy: {fold_metrics_dict['accuracy']:.3f}, Log Loss: {fold_metrics_dict['log_loss']:.3f}")
+            if fold_metrics_dict["roc_auc"] is not None:
+                print(f"    ROC-AUC: {fold_metrics_dict['roc_auc']:.3f}")
+            
+            # Store predictions; the predictions frame is built once from these arrays
+            offset = state["offset"]
+            end = offset + len(y_test)
+            state["rows"][offset:end] = np.arange(test_start, test_end)
+            state["fold_ids"][offset:end] = fold
+            state["y_true"][offset:end] = y_test
+            state["p_hat"][offset:end] = r["p_hat"]
+            
+            # Task 2: Store calibrated predictions
+            state["p_hat_sigmoid"][offset:end] = r["p_hat_sigmoid"]
+            state["p_hat_isotonic"][offset:end] = r["p_hat_isotonic"]
+            
+            # Task 5: Store baseline predictions
+            state["baseline_line"][offset:end] = r["baseline_line"]
+            state["offset"] = end
+            state["last_classifier"] = r["classifier"]
+    
+    if failed_folds:
+        print(f"\n  {len(failed_folds)} fold(s) failed:")
+        for set_name, fold, error in failed_folds:
+            label = f"[{set_name}] " if set_name is not None else ""
+            print(f"    {label}fold {fold}: {error}")
+        if not debug_folds:
+            print("  (set ML_DEBUG_FOLDS=1 or pass --debug-folds for tracebacks)")
+    
+    fold = len(fold_bounds)
+    results = {}
+    for set_name, state in states.items():
+        if state["offset"] == 0:
+            label = f" for {set_name}" if set_name is not None else ""
+            print(f"  ERROR: No valid folds completed{label}")
             continue
+        if set_name is not None:
+            print(f"\n[{set_name}]")
+        results[set_name] = _summarize_backtest(state, meta, fold)
+        if return_last_classifier:
+            results[set_name] += (state["last_classifier"],)
+    
+    return results
+
+
+def _run_fold(fold, train_start, test_start, test_end, y, set_inputs, prev_classifiers=None, debug=False):
+    """
+    Fit and evaluate one walk-forward fold for every feature set.
+    
+    Args:
+        fold: Fold number
+        train_start, test_start, test_end: Positional row bounds
+        y: Label array (sorted by date)
+        set_inputs: Dict of set name -> (X, line baseline columns, line baseline matrix)
+        prev_classifiers: Optional dict of set name -> previous fold's classifier (warm start)
+        debug: Print the full traceback when a set's fold fails
         
-        print(f"  Fold {fold}: train=[{train_start}:{test_start}] ({len(X_train)} rows), test=[{test_start}:{test_end}] ({len(X_test)} rows)")
-        
-        # Task 5: Baseline A - Constant probability 0.5
-        baseline_05_proba = np.full(len(y_test), 0.5)
-        
-        # Task 5: Baseline B - Line-only model (TEAM_TOTAL_LINE, GAME_TOTAL_LINE if available)
-        baseline_line_feature_cols = []
-        if "TEAM_TOTAL_LINE" in X_test.columns:
-            baseline_line_feature_cols.append("TEAM_TOTAL_LINE")
-        if "GAME_TOTAL_LINE" in X_test.columns:
-            baseline_line_feature_cols.append("GAME_TOTAL_LINE")
+    Returns:
+        Dict of set name -> dict of fold arrays, metrics and fitted classifier
+        ({"error": repr(e)} for sets whose fold failed)
+    """
+    prev_classifiers = prev_classifiers or {}
+    
+    # Contiguous positional slices; nothing below mutates them, so no copies
+    y_train = y[train_start:test_start]
+    y_test = y[test_start:test_end]
+    
+    # Split train into train_fit (80%) and train_cal (20%) for calibration
+    train_fit_size = int(len(y_train) * 0.8)
+    y_train_fit = y_train[:train_fit_size]
+    y_train_cal = y_train[train_fit_size:]
+    
+    # Task 5: Baseline B - Line-only model, fitted once per distinct line-column subset
+    line_baselines = {}
+    
+    results = {}
+    for set_name, (X, line_cols, X_line) in set_inputs.items():
+        X_train = X.iloc[train_start:test_start]
+        X_test = X.iloc[test_start:test_end]
         
-        baseline_line_proba = None
-        if baseline_line_feature_cols:
-            try:
-                X_train_line = X_train[baseline_line_feature_cols].copy()
-                X_test_line = X_test[baseline_line_feature_cols].copy()
-                baseline_line_model = train_model(X_train_line, y_train)
-                baseline_line_proba_array = predict_proba(baseline_line_model, X_test_line)
-                baseline_line_proba = baseline_line_proba_array[:, 1]
-            except Exception as e:
-                print(f"    WARNING: Line-only baseline failed: {e}")
-                baseline_line_proba = baseline_05_proba.copy()  # Fallback to 0.5
-        else:
-            baseline_line_proba = baseline_05_proba.copy()  # Fallback to 0.5
+        if line_cols not in line_baselines:
+            if line_cols:
+                try:
+                    # Same model as train_model, solved by Newton steps (1-2 features)
+                    line_baselines[line_cols] = fit_predict_logistic_newton(
+                        X_line[train_start:test_start], y_train, X_line[test_start:test_end]
+                    )
+                except Exception as e:
+                    print(f"    WARNING: Line-only baseline failed: {e}")
+                    line_baselines[line_cols] = np.full(len(y_test), 0.5)  # Fallback to 0.5
+            else:
+                line_baselines[line_cols] = np.full(len(y_test), 0.5)  # Fallback to 0.5
         
         # Task 1: Test multiple C values - use default C for now (we'll test multiple in CLI)
         # Task 2: Add calibration inside each fold
         try:
-            # Split train into train_fit (80%) and train_cal (20%) for calibration
-            train_fit_size = int(len(X_train) * 0.8)
-            X_train_fit = X_train.iloc[:train_fit_size].copy()
-            y_train_fit = y_train.iloc[:train_fit_size].copy()
-            X_train_cal = X_train.iloc[train_fit_size:].copy()
-            y_train_cal = y_train.iloc[train_fit_size:].copy()
+            X_train_fit = X_train.iloc[:train_fit_size]
+            X_train_cal = X_train.iloc[train_fit_size:]
             
-            # Train base model on train_fit
-            model = train_model(X_train_fit, y_train_fit)
+            # Train base model on train_fit (optionally from the previous fold's coefficients)
+            prev_classifier = prev_classifiers.get(set_name)
+            if prev_classifier is not None:
+                model = train_model(
+                    X_train_fit,
+                    y_train_fit,
+                    init_coef=prev_classifier.coef_,
+                    init_intercept=prev_classifier.intercept_,
+                )
+            else:
+                model = train_model(X_train_fit, y_train_fit)
             
             # Predict uncalibrated
             proba = predict_proba(model, X_test)
             y_pred_proba = proba[:, 1]  # Probability of class 1
             
             # Task 2: Calibrate on train_cal (sigmoid and isotonic)
+            # Both calibrators are 1-D maps over the base model's probabilities, so
+            # the base model runs once on train_cal and the test-set probabilities
+            # above are reused instead of re-predicting per calibrator.
             y_pred_proba_sigmoid = y_pred_proba.copy()
             y_pred_proba_isotonic = y_pred_proba.copy()
             
             if len(X_train_cal) > 10:  # Need minimum samples for calibration
+                proba_cal_train = predict_proba(model, X_train_cal)[:, 1]
+                
                 try:
                     # Sigmoid calibration
-                    calibrated_sigmoid = train_calibrated_model(model, X_train_cal, y_train_cal, method="sigmoid")
-                    proba_sigmoid = predict_proba(calibrated_sigmoid, X_test)
-                    y_pred_proba_sigmoid = proba_sigmoid[:, 1]
+                    calibrator_sigmoid = ProbabilityCalibrator("sigmoid").fit(proba_cal_train, y_train_cal)
+                    y_pred_proba_sigmoid = calibrator_sigmoid.transform(y_pred_proba)
                 except Exception as e:
                     print(f"      WARNING: Sigmoid calibration failed: {e}")
                 
                 try:
                     # Isotonic calibration
-                    calibrated_isotonic = train_calibrated_model(model, X_train_cal, y_train_cal, method="isotonic")
-                    proba_isotonic = predict_proba(calibrated_isotonic, X_test)
-                    y_pred_proba_isotonic = proba_isotonic[:, 1]
+                    calibrator_isotonic = ProbabilityCalibrator("isotonic").fit(proba_cal_train, y_train_cal)
+                    y_pred_proba_isotonic = calibrator_isotonic.transform(y_pred_proba)
                 except Exception as e:
                     print(f"      WARNING: Isotonic calibration failed: {e}")
             
@@ -161,68 +386,74 @@ def walk_forward_backtest(df, feature_cols, label_col, min_train_size=None, test
             fold_metrics_dict["fold"] = fold
             fold_metrics_dict["train_size"] = len(X_train)
             fold_metrics_dict["test_size"] = len(X_test)
-            fold_metrics.append(fold_metrics_dict)
-            
-            print(f"    Accuracy: {fold_metrics_dict['accuracy']:.3f}, Log Loss: {fold_metrics_dict['log_loss']:.3f}")
-            if fold_metrics_dict["roc_auc"] is not None:
-                print(f"    ROC-AUC: {fold_metrics_dict['roc_auc']:.3f}")
             
-            # Store predictions (uncalibrated for now, we'll add calibrated columns later)
-            fold_predictions = meta_test.copy()
-            fold_predictions["y_true"] = y_test.values
-            fold_predictions["p_hat"] = y_pred_proba
-            fold_predictions["p_hat_sigmoid"] = y_pred_proba_sigmoid
-            fold_predictions["p_hat_isotonic"] = y_pred_proba_isotonic
-            fold_predictions["fold"] = fold
-            all_predictions.append(fold_predictions)
-            
-            all_y_true.extend(y_test.values.tolist())
-            all_y_pred_proba.extend(y_pred_proba.tolist())
-            
-            # Task 2: Store calibrated predictions
-            all_y_pred_proba_sigmoid.extend(y_pred_proba_sigmoid.tolist())
-            all_y_pred_proba_isotonic.extend(y_pred_proba_isotonic.tolist())
-            
-            # Task 5: Store baseline predictions
-            all_baseline_05_proba.extend(baseline_05_proba.tolist())
-            all_baseline_line_proba.extend(baseline_line_proba.tolist())
+            results[set_name] = {
+                "p_hat": y_pred_proba,
+                "p_hat_sigmoid": y_pred_proba_sigmoid,
+                "p_hat_isotonic": y_pred_proba_isotonic,
+                "baseline_line": line_baselines[line_cols],
+                "fold_metrics": fold_metrics_dict,
+                "classifier": model.named_steps["classifier"],
+            }
             
         except Exception as e:
-            print(f"    ERROR in fold {fold}: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # Move to next fold
-        test_start = test_end
-        fold += 1
+            # Reported by the caller; full traceback only when debugging folds
+            if debug:
+                traceback.print_exc()
+            results[set_name] = {"error": repr(e)}
     
-    if not all_predictions:
-        raise ValueError("No valid folds completed")
+    return results
+
+
+def _summarize_backtest(state, meta, n_folds):
+    """
+    Combine one feature set's out-of-fold predictions into overall metrics.
     
-    # Combine all predictions
-    predictions_df = pd.concat(all_predictions, ignore_index=True)
+    Args:
+        state: Per-set accumulator built by walk_forward_backtest_multi
+        meta: Metadata columns of the sorted backtest frame
+        n_folds: Number of folds run
+        
+    Returns:
+        Tuple of (predictions_df, metrics_dict, calibration_df)
+    """
+    fold = n_folds
+    fold_metrics = state["fold_metrics"]
     
-    # Compute overall metrics
-    y_true_all = np.array(all_y_true)
-    y_pred_proba_all = np.array(all_y_pred_proba)
+    # Drop the unused tail (folds that failed)
+    offset = state["offset"]
+    y_true_all = state["y_true"][:offset]
+    y_pred_proba_all = state["p_hat"][:offset]
+    y_pred_proba_sigmoid_all = state["p_hat_sigmoid"][:offset]
+    y_pred_proba_isotonic_all = state["p_hat_isotonic"][:offset]
+    baseline_05_proba_all = state["baseline_05"][:offset]
+    baseline_line_proba_all = state["baseline_line"][:offset]
     
-    overall_metrics, overall_calibration = compute_all_metrics(y_true_all, y_pred_proba_all)
+    # Build all predictions in one frame: one metadata gather, then column assignment
+    predictions_df = meta.iloc[state["rows"][:offset]].reset_index(drop=True)
+    predictions_df["y_true"] = y_true_all
+    predictions_df["p_hat"] = y_pred_proba_all
+    predictions_df["p_hat_sigmoid"] = y_pred_proba_sigmoid_all
+    predictions_df["p_hat_isotonic"] = y_pred_proba_isotonic_all
+    predictions_df["fold"] = state["fold_ids"][:offset]
+    
+    # Compute overall (uncalibrated), calibrated (Task 2) and baseline (Task 5)
+    # metrics in one batch over the shared labels (baseline A is a constant 0.5,
+    # so its metrics have a closed form)
+    batch = compute_all_metrics_batch(y_true_all, {
+        "uncalibrated": y_pred_proba_all,
+        "sigmoid": y_pred_proba_sigmoid_all,
+        "isotonic": y_pred_proba_isotonic_all,
+        "baseline_05": baseline_05_proba_all,
+        "baseline_line": baseline_line_proba_all,
+    }, constant_names=("baseline_05",))
+    overall_metrics, overall_calibration = batch["uncalibrated"]
     overall_metrics["n_folds"] = fold
     overall_metrics["fold_metrics"] = fold_metrics
-    
-    # Task 2: Compute calibrated metrics
-    y_pred_proba_sigmoid_all = np.array(all_y_pred_proba_sigmoid)
-    y_pred_proba_isotonic_all = np.array(all_y_pred_proba_isotonic)
-    
-    metrics_sigmoid, calibration_sigmoid = compute_all_metrics(y_true_all, y_pred_proba_sigmoid_all)
-    metrics_isotonic, calibration_isotonic = compute_all_metrics(y_true_all, y_pred_proba_isotonic_all)
-    
-    # Task 5: Compute baseline metrics
-    baseline_05_proba_all = np.array(all_baseline_05_proba)
-    baseline_line_proba_all = np.array(all_baseline_line_proba)
-    
-    baseline_05_metrics, _ = compute_all_metrics(y_true_all, baseline_05_proba_all)
-    baseline_line_metrics, _ = compute_all_metrics(y_true_all, baseline_line_proba_all)
+    metrics_sigmoid, calibration_sigmoid = batch["sigmoid"]
+    metrics_isotonic, calibration_isotonic = batch["isotonic"]
+    baseline_05_metrics, _ = batch["baseline_05"]
+    baseline_line_metrics, _ = batch["baseline_line"]
     
     # Task 4: Print comparison table (emphasize LogLoss as primary)
     print(f"\n{'='*80}")
@@ -256,18 +487,8 @@ def walk_forward_backtest(df, feature_cols, label_col, min_train_size=None, test
     if metrics_isotonic['log_loss'] < 1.0:
         candidates.append(("isotonic", metrics_isotonic, calibration_isotonic))
     
-    # Find best by LogLoss
-    best_name = None
-    best_metrics = None
-    best_calibration = None
-    best_logloss = float('inf')
-    
-    for name, metrics, calib in candidates:
-        if metrics['log_loss'] < best_logloss:
-            best_logloss = metrics['log_loss']
-            best_name = name
-            best_metrics = metrics
-            best_calibration = calib
+    # Find best by LogLoss (first candidate wins ties)
+    best_name, best_metrics, best_calibration = min(candidates, key=lambda c: c[1]['log_loss'])
     
     # Task 1: Update predictions_df to use best model's predictions
     if best_name == "sigmoid":
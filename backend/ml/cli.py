@@ -2,7 +2,6 @@
 CLI entrypoint for ML pipeline.
 """
 import argparse
-import json
 import sys
 from pathlib import Path
 import pandas as pd
@@ -15,11 +14,72 @@ from .data import load_events_df, get_base_features
 from .features import select_base_features, rolling_features, finalize_matrix, verify_no_leakage
 from .backtest import walk_forward_backtest
 from .train import train_model
-from .ablation import run_ablation_study
+from .ablation import run_ablation_study, FEATURE_SET_REGISTRY
 from .interpretability import extract_coefficients, print_coefficients_table, save_coefficients
 from .summary import create_ablation_summary
 from .picks import run_picks_analysis, save_picks_results, print_picks_summary
 
+# Parquet output needs pyarrow; predictions.csv is always written regardless
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# orjson writes the JSON artifacts
+import orjson
+
+
+def json_default(obj):
+    """
+    Convert values the JSON serializer doesn't handle natively.
+    
+    orjson only calls this for types it can't serialize itself (most NumPy
+    values are native with OPT_SERIALIZE_NUMPY), e.g. pandas objects and
+    non-native NumPy scalars. Anything else falls back to str.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict("records")
+    if isinstance(obj, (pd.Series, np.ndarray)):
+        return obj.tolist()
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    return str(obj)
+
+
+def write_json(path, obj, default=json_default):
+    """
+    Write obj to path as indented JSON (orjson).
+    
+    Args:
+        path: Output file path
+        obj: Object to serialize (dicts/lists of plain, NumPy and pandas values)
+        default: Fallback converter for unsupported types (defaults to json_default)
+    """
+    Path(path).write_bytes(
+        orjson.dumps(
+            obj,
+            default=default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    )
+
+
+def _n_unique(series):
+    """
+    Number of distinct non-null values.
+    
+    load_events_df builds its categoricals from the observed values, so for those
+    the categories are the unique values and no pass over the rows is needed.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return len(series.cat.categories)
+    return series.nunique()
+
 
 def print_summary(df, label_col):
     """Print data summary."""
@@ -29,8 +89,8 @@ def print_summary(df, label_col):
     print(f"Total rows: {len(df)}")
     print(f"Columns: {len(df.columns)}")
     print(f"\nDate range: {df['date'].min()} to {df['date'].max()}")
-    print(f"Unique games: {df['game_id'].nunique()}")
-    print(f"Unique teams: {df['team_id'].nunique()}")
+    print(f"Unique games: {_n_unique(df['game_id'])}")
+    print(f"Unique teams: {_n_unique(df['team_id'])}")
     
     if label_col in df.columns:
         label_counts = df[label_col].value_counts()
@@ -60,23 +120,39 @@ def cmd_backtest(args):
     df = select_base_features(df)
     df = rolling_features(df, team_id_col="team_id", windows=[5, 10])
     
-    # Verify no leakage (spot check)
+    # Verify no leakage on a fixed sample: the first rolling feature of each kind
+    # (margin mean/std, hit rate) is recomputed for a few teams with pandas
+    # rolling().shift(1) and compared (raises on any mismatch)
     print("\n3. Verifying no leakage...")
     rolling_cols = [col for col in df.columns if col.startswith("rolling_")]
-    if rolling_cols:
-        sample_col = rolling_cols[0]
-        verify_no_leakage(df, sample_col, LABEL_FIELD, team_id_col="team_id", n_check=5)
+    sample_cols = []
+    for kind in ("_margin_mean_", "_margin_std_", "_over_rate_"):
+        col = next((c for c in rolling_cols if kind in c), None)
+        if col is not None:
+            sample_cols.append(col)
+    for col in sample_cols:
+        verify_no_leakage(df, col, team_id_col="team_id", n_check=5)
+    if sample_cols:
+        print(f"  ✓ {len(sample_cols)} sampled rolling features match shift(1) on sampled teams")
     
     # Finalize matrix
     print("\n4. Finalizing feature matrix...")
-    X, y, meta = finalize_matrix(df, LABEL_FIELD)
+    df_final, feature_cols = finalize_matrix(df, LABEL_FIELD)
+    del df
     
-    # Get feature column names
-    feature_cols = X.columns.tolist()
     print(f"  Feature columns ({len(feature_cols)}): {feature_cols[:10]}...")
     
-    # Merge X, y, meta for backtest
-    df_final = pd.concat([X, y, meta], axis=1)
+    # --warm-start starts each fold from the previous fold's coefficients
+    warm_start = True if getattr(args, "warm_start", False) else None
+    # --n-jobs runs backtest folds in parallel (implies no warm start)
+    n_jobs = getattr(args, "n_jobs", None)
+    # --debug-folds prints full tracebacks for failed folds
+    debug_folds = True if getattr(args, "debug_folds", False) else None
+    
+    # Sort by date once here: the ablation and best-set backtests below all run
+    # on column subsets of this frame, so they skip their own sort
+    # (mergesort: stable, fast on mostly-sorted dates)
+    df_final = df_final.sort_values("date", kind="mergesort").reset_index(drop=True)
     
     # Task 1: Run ablation study FIRST to find best model
     print("\n5. Running ablation study to find best model...")
@@ -84,6 +160,10 @@ def cmd_backtest(args):
         df_final,
         LABEL_FIELD,
         feature_cols,
+        warm_start=warm_start,
+        n_jobs=n_jobs,
+        assume_sorted=True,
+        debug_folds=debug_folds,
     )
     
     # Find best model (by LogLoss)
@@ -94,89 +174,59 @@ def cmd_backtest(args):
     print(f"  Log Loss: {best_result['log_loss']:.3f}, AUC: {best_result.get('roc_auc', 'N/A')}")
     
     # Get best feature set columns
-    from .ablation import (
-        get_feature_set_A_line_only,
-        get_feature_set_B_line_plus_context,
-        get_feature_set_C_line_plus_rolling_totals,
-        get_feature_set_D_full_model,
-    )
-    
-    if "A: line_only" in best_feature_set_name:
-        best_feature_cols = get_feature_set_A_line_only(df_final, feature_cols)
-    elif "B: line_plus_context" in best_feature_set_name:
-        best_feature_cols = get_feature_set_B_line_plus_context(df_final, feature_cols)
-    elif "C: line_plus_rolling_totals" in best_feature_set_name:
-        best_feature_cols = get_feature_set_C_line_plus_rolling_totals(df_final, feature_cols)
-    else:  # D: full_model
-        best_feature_cols = get_feature_set_D_full_model(df_final, feature_cols)
+    best_feature_cols = FEATURE_SET_REGISTRY[best_feature_set_name](df_final, feature_cols)
     
     # Task 1: Run backtest with BEST feature set for artifacts
     print(f"\n6. Running walk-forward backtest with best feature set ({len(best_feature_cols)} features)...")
     
-    # Filter df_final for best feature set
+    # Filter df_final for best feature set (dict.fromkeys dedupes TEAM_TOTAL_LINE,
+    # which is both a feature and metadata; column selection already returns a new frame)
     metadata_cols = [LABEL_FIELD, "date", "team_id", "game_id", "TEAM_TOTAL_LINE"]
-    cols_needed = best_feature_cols + [c for c in metadata_cols if c not in best_feature_cols]
-    cols_available = [c for c in cols_needed if c in df_final.columns]
-    seen = set()
-    cols_unique = [c for c in cols_available if c not in seen and not seen.add(c)]
-    df_best = df_final[cols_unique].copy()
+    available = frozenset(df_final.columns)
+    df_best = df_final[[c for c in dict.fromkeys(best_feature_cols + metadata_cols) if c in available]]
     
-    predictions_df, metrics_dict, calibration_df = walk_forward_backtest(
+    predictions_df, metrics_dict, calibration_df, last_classifier = walk_forward_backtest(
         df_best,
         best_feature_cols,
         LABEL_FIELD,
         min_train_size=MIN_TRAIN_SIZE,
         test_chunk_size=TEST_CHUNK_SIZE,
+        warm_start=warm_start,
+        n_jobs=n_jobs,
+        assume_sorted=True,
+        debug_folds=debug_folds,
+        return_last_classifier=True,
     )
     
     # Save predictions (from best model)
     print("\n7. Saving artifacts from best model...")
     predictions_path = OUTPUT_DIR / "predictions.csv"
+    
+    # Persist pick columns so the API serves them without recomputing
+    p_hat = predictions_df["p_hat"].to_numpy()
+    predictions_df["confidence"] = np.abs(p_hat - 0.5)
+    predictions_df["predicted_side"] = np.where(p_hat >= 0.5, "OVER", "UNDER")
+    
     predictions_df.to_csv(predictions_path, index=False)
     print(f"  Saved predictions to {predictions_path}")
     
-    # Save metrics (convert to JSON-safe format)
+    # Typed copy for the API (no CSV parsing, dtypes preserved)
+    if PARQUET_AVAILABLE:
+        predictions_parquet_path = OUTPUT_DIR / "predictions.parquet"
+        predictions_df.to_parquet(predictions_parquet_path, index=False)
+        print(f"  Saved predictions to {predictions_parquet_path}")
+    
+    # Save metrics; pandas/NumPy values are converted by the serializer (json_default)
     metrics_path = OUTPUT_DIR / "metrics.json"
     
-    def make_json_safe(obj):
-        """Recursively convert objects to JSON-safe types."""
-        if isinstance(obj, dict):
-            return {k: make_json_safe(v) for k, v in obj.items()}
-        elif isinstance(obj, (list, tuple)):
-            return [make_json_safe(item) for item in obj]
-        elif isinstance(obj, (pd.DataFrame, pd.Series)):
-            # Convert pandas objects to dict/list
-            if isinstance(obj, pd.DataFrame):
-                return obj.to_dict("records")
-            else:
-                return obj.tolist()
-        elif isinstance(obj, (np.integer, np.floating)):
-            return float(obj) if isinstance(obj, np.floating) else int(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, (str, int, float, bool, type(None))):
-            return obj
-        else:
-            # Fallback: convert to string
-            return str(obj)
-    
-    # Convert metrics_dict to JSON-safe format (handles circular refs by copying)
-    import copy
-    metrics_dict_copy = copy.deepcopy(metrics_dict)
-    metrics_safe = make_json_safe(metrics_dict_copy)
-    
-    # Ensure fold_metrics is handled if it exists
-    if "fold_metrics" in metrics_dict:
-        # If fold_metrics is a DataFrame, convert it
-        if isinstance(metrics_dict["fold_metrics"], pd.DataFrame):
-            metrics_safe["fold_metrics"] = metrics_dict["fold_metrics"].to_dict("records")
-    
-    # Add best feature set info
-    metrics_safe["best_feature_set"] = best_feature_set_name
-    metrics_safe["best_variant"] = best_variant
-    
-    with open(metrics_path, "w") as f:
-        json.dump(metrics_safe, f, indent=2)
+    # Shallow copy: the nested values are only read, so no deepcopy is needed
+    metrics_safe = {
+        **metrics_dict,
+        "best_feature_set": best_feature_set_name,
+        "best_variant": best_variant,
+    }
+    
+    write_json(metrics_path, metrics_safe)
     print(f"  Saved metrics to {metrics_path}")
     
     # Save calibration (from best model)
@@ -186,10 +236,20 @@ def cmd_backtest(args):
     
     # Task 2: Extract and save coefficients from best model
     print("\n8. Extracting coefficients from best model...")
-    # Train final model on all data with best feature set
-    X_best = df_best[best_feature_cols].copy()
-    y_best = df_best[LABEL_FIELD].copy()
-    final_model = train_model(X_best, y_best)
+    # Train final model on all data with best feature set, as float64 like the
+    # backtest fold models (numeric columns only; the pipeline drops the rest)
+    X_best = df_best[best_feature_cols]
+    X_best = X_best.astype({c: np.float64 for c in X_best.select_dtypes(include=[np.number]).columns})
+    y_best = df_best[LABEL_FIELD]
+    # Warm start from the last fold's coefficients: that fold trained on most of
+    # the same rows, so the full-data fit (same objective) converges in fewer
+    # iterations; train_model falls back to a cold fit on a shape mismatch
+    final_model = train_model(
+        X_best,
+        y_best,
+        init_coef=last_classifier.coef_ if last_classifier is not None else None,
+        init_intercept=last_classifier.intercept_ if last_classifier is not None else None,
+    )
     
     # Extract coefficients
     coef_dict = extract_coefficients(final_model, best_feature_cols)
@@ -226,10 +286,9 @@ def cmd_backtest(args):
     create_ablation_summary(ablation_results, best_result, ablation_summary_path)
     print(f"  Saved ablation summary to {ablation_summary_path}")
     
-    # Save ablation results JSON
+    # Save ablation results JSON (NumPy metric values serialize as numbers, not strings)
     ablation_path = OUTPUT_DIR / "ablation_results.json"
-    with open(ablation_path, "w") as f:
-        json.dump(ablation_results, f, indent=2, default=str)
+    write_json(ablation_path, ablation_results)
     print(f"  Saved ablation results to {ablation_path}")
     
     # Task 3: Run picks analysis
@@ -249,7 +308,22 @@ def main():
     
     # Backtest command
     backtest_parser = subparsers.add_parser("backtest", help="Run walk-forward backtest")
-    # Add any backtest-specific args here if needed
+    backtest_parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Start each fold's fit from the previous fold's coefficients (serial runs only; moves metrics slightly)",
+    )
+    backtest_parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="Run backtest folds in parallel on this many cores (-1 = all; disables warm start)",
+    )
+    backtest_parser.add_argument(
+        "--debug-folds",
+        action="store_true",
+        help="Print full tracebacks for failed backtest folds",
+    )
     
     # Inspect data command
     inspect_parser = subparsers.add_parser("inspect_data", help="Inspect data without running pipeline")
@@ -25,6 +25,9 @@ LABEL_FIELD = os.getenv("LABEL_FIELD") or os.getenv("ML_LABEL_FIELD") or "TEAM_T
 
 # Support both DATE_FIELD and ML_DATE_FIELD
 DATE_FIELD_OVERRIDE = os.getenv("DATE_FIELD") or os.getenv("ML_DATE_FIELD")
+# Optional strftime format for string dates (e.g. "%Y-%m-%d"); by default
+# pandas infers it from the first value
+ML_DATE_FORMAT = os.getenv("ML_DATE_FORMAT")
 
 
 # Field mappings (to handle variations in column names)
@@ -47,9 +50,20 @@ ROLLING_WINDOWS = [5, 10]  # Can expand if needed
 # Task 1: LogisticRegression C parameter (default 0.1 for stronger regularization)
 LOGISTIC_C = float(os.getenv("ML_LOGISTIC_C", "0.1"))
 LOGISTIC_MAX_ITER = int(os.getenv("ML_LOGISTIC_MAX_ITER", "2000"))
+# Opt-in: warm-start each backtest fold from the previous fold's coefficients
+# (ML_WARM_START=1 or `backtest --warm-start`). Off by default because the
+# fits stop at a slightly different point, which moves the reported metrics
+WARM_START = os.getenv("ML_WARM_START", "0") == "1"
+# Backtest folds to run in parallel (joblib; -1 = all cores). Parallel folds
+# are independent, so any value other than 1 turns warm start off.
+BACKTEST_N_JOBS = int(os.getenv("ML_N_JOBS", "1"))
+# Print full tracebacks for failed backtest folds (`backtest --debug-folds`)
+DEBUG_FOLDS = os.getenv("ML_DEBUG_FOLDS", "0") == "1"
 
 # Dataset expansion options (Task 2)
 ML_LIMIT = os.getenv("ML_LIMIT")  # None if not set
 ML_QUERY_JSON = os.getenv("ML_QUERY_JSON")  # None if not set
+ML_PROJECTION_JSON = os.getenv("ML_PROJECTION_JSON")  # None if not set (use default exclusions)
+ML_BATCH_SIZE = int(os.getenv("ML_BATCH_SIZE", "5000"))  # Mongo cursor batch size for event loads
 ML_SORT_FIELD = os.getenv("ML_SORT_FIELD", "GAME_ID")
 ML_SORT_DIR = int(os.getenv("ML_SORT_DIR", "1"))  # 1 for ascending, -1 for descending
@@ -1,6 +1,10 @@
 """
 Data loading from MongoDB and DataFrame conversion.
 """
+import json
+import re
+import warnings
+import numpy as np
 import pandas as pd
 from pymongo import MongoClient
 
@@ -8,14 +12,36 @@ from .config import (
     EVENTS_COLLECTION,
     FIELD_MAPPINGS,
     DATE_FIELD_OVERRIDE,
+    ML_DATE_FORMAT,
     MONGO_URI,
     MONGO_DB,
     ML_LIMIT,
     ML_QUERY_JSON,
+    ML_PROJECTION_JSON,
+    ML_BATCH_SIZE,
     ML_SORT_FIELD,
     ML_SORT_DIR,
 )
 
+# Fields never used by the pipeline (names/player IDs are excluded from features,
+# _id is dropped after load). Excluding them server-side skips their transfer
+# and BSON decode.
+DEFAULT_EXCLUDED_FIELDS = [
+    "_id",
+    "PRIMARY_SCORER_NAME", "PRIMARY_FACILITATOR_NAME", "PRIMARY_REBOUNDER_NAME",
+    "PRIMARY_SCORER_PLAYER_ID", "PRIMARY_FACILITATOR_PLAYER_ID", "PRIMARY_REBOUNDER_PLAYER_ID",
+]
+
+# Substrings that rule a column out of get_base_features: IDs, names, dates,
+# context, and outcome columns (compiled once at import)
+_BASE_EXCLUDE_RE = re.compile("|".join(map(re.escape, [
+    "GAME_ID", "TEAM_ID", "TEAM_ABBREVIATION", "game_id", "team_id",
+    "date", "ctx_", "context",
+    "PRIMARY_SCORER_NAME", "PRIMARY_FACILITATOR_NAME", "PRIMARY_REBOUNDER_NAME",
+    "PRIMARY_SCORER_PLAYER_ID", "PRIMARY_FACILITATOR_PLAYER_ID", "PRIMARY_REBOUNDER_PLAYER_ID",
+    "_OVER_HIT", "_MARGIN", "_ACTUAL", "_STRONG_HIT",
+])))
+
 # Cache the client/db so we don't reconnect each call
 _client = None
 _db = None
@@ -29,27 +55,100 @@ def _get_db():
     return _db
 
 
-def _find_field(df, candidates):
-    """Find first matching field from candidates in df.columns."""
-    for candidate in candidates:
-        if candidate in df.columns:
-            return candidate
-    return None
+def _find_field(col_set, candidates):
+    """Find first matching field from candidates in col_set (a set of column names)."""
+    return next((c for c in candidates if c in col_set), None)
+
+
+def _tokens_to_01(series, truthy):
+    """
+    1 where str(value).upper() is in truthy, else 0 (int8 array).
+    
+    The columns hold a handful of distinct tokens, so the string conversion
+    runs once per distinct value (via factorize) instead of once per row.
+    Missing values map to 0, as "NAN"/"NONE" would.
+    """
+    codes, uniques = pd.factorize(series)
+    # Extra trailing False: code -1 (missing) indexes it
+    hits = np.array([str(value).upper() in truthy for value in uniques] + [False])
+    return hits[codes].astype(np.int8)
+
+
+def _cursor_to_df(cursor, chunk_size):
+    """
+    Build a DataFrame from a cursor, chunk_size documents at a time.
+    
+    Only one chunk of documents (Python dicts, much larger than the decoded
+    columns) is alive at a time, instead of a list of every document.
+    
+    Args:
+        cursor: Iterable of documents (dicts)
+        chunk_size: Documents per intermediate DataFrame
+        
+    Returns:
+        DataFrame with one row per document (same as pd.DataFrame(list(cursor)))
+    """
+    frames = []
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= chunk_size:
+            frames.append(pd.DataFrame(batch))
+            batch = []
+    if batch or not frames:
+        frames.append(pd.DataFrame(batch))
+    if len(frames) == 1:
+        return frames[0]
+    
+    # A field that is missing/None in a whole chunk is object dtype in that
+    # chunk, so the concat can end up object; re-infer like a single build
+    # would. (That re-inference also makes pandas' all-NA concat dtype
+    # deprecation irrelevant here, so its FutureWarning is silenced.)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        df = pd.concat(frames, ignore_index=True, copy=False)
+    return df.infer_objects()
+
+
+def _parse_dates(series, date_format=None):
+    """
+    Parse a date column to datetime64 (NaT for missing/unparseable values).
+
+    Mongo dates arrive as datetime objects, which infer_objects() has already
+    turned into datetime64, so those are returned as is. Strings use
+    date_format if given; otherwise pandas infers the format from the first
+    value and parses the rest with it (no per-element dateutil fallback).
+
+    Args:
+        series: Raw date column
+        date_format: Optional strftime format for string dates
+
+    Returns:
+        datetime64 Series
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, format=date_format, errors="coerce")
 
 
-def load_events_df(collection_name=None, projection=None):
+def load_events_df(collection_name=None, projection=None, date_format=None):
     """
     Load all events from MongoDB and convert to pandas DataFrame.
 
     Args:
         collection_name: MongoDB collection name (defaults to config)
-        projection: Optional projection dict to limit fields loaded
+        projection: Optional projection dict to limit fields loaded (defaults to
+            ML_PROJECTION_JSON, else excluding DEFAULT_EXCLUDED_FIELDS)
+        date_format: Optional strftime format for string dates (defaults to
+            ML_DATE_FORMAT, else inferred from the first value)
 
     Returns:
         DataFrame with events, sorted by date
     """
     if collection_name is None:
         collection_name = EVENTS_COLLECTION
+    if date_format is None:
+        date_format = ML_DATE_FORMAT
 
     print(f"Loading events from {MONGO_DB}.{collection_name}...")
 
@@ -58,19 +157,28 @@ def load_events_df(collection_name=None, projection=None):
     # Task 2: Support query filter and sort options
     query_filter = {}
     if ML_QUERY_JSON:
-        import json
         try:
             query_filter = json.loads(ML_QUERY_JSON)
             print(f"  Using query filter: {query_filter}")
         except json.JSONDecodeError as e:
             print(f"  WARNING: Invalid ML_QUERY_JSON, ignoring: {e}")
     
+    # Server-side projection: drop unused fields before they are sent/decoded
+    if projection is None and ML_PROJECTION_JSON:
+        try:
+            projection = json.loads(ML_PROJECTION_JSON)
+            print(f"  Using projection: {projection}")
+        except json.JSONDecodeError as e:
+            print(f"  WARNING: Invalid ML_PROJECTION_JSON, ignoring: {e}")
+    if projection is None:
+        projection = {field: 0 for field in DEFAULT_EXCLUDED_FIELDS}
+    
     # Build cursor with filter
     cursor = db[collection_name].find(query_filter, projection)
     
     # Task: Use GAME_DATE for sorting if available, otherwise fall back to GAME_ID
     # Check if GAME_DATE exists in collection
-    sample_doc = db[collection_name].find_one(query_filter, {"GAME_DATE": 1})
+    sample_doc = db[collection_name].find_one(query_filter, {"GAME_DATE": 1, "_id": 0})
     has_gamedate = sample_doc and "GAME_DATE" in sample_doc and sample_doc.get("GAME_DATE") is not None
     
     if has_gamedate:
@@ -94,14 +202,14 @@ def load_events_df(collection_name=None, projection=None):
         cursor = cursor.limit(limit_val)
         print(f"  Using limit: {limit_val}")
     
-    events = list(cursor)
+    # Larger batches mean fewer server round trips
+    cursor = cursor.batch_size(ML_BATCH_SIZE)
+    df = _cursor_to_df(cursor, ML_BATCH_SIZE)
 
-    if not events:
+    if df.empty:
         raise ValueError(f"No events found in {collection_name}")
 
-    print(f"  Loaded {len(events)} event documents")
-
-    df = pd.DataFrame(events)
+    print(f"  Loaded {len(df)} event documents")
 
     # Drop Mongo _id (not useful for modeling, can cause serialization issues)
     if "_id" in df.columns:
@@ -111,13 +219,13 @@ def load_events_df(collection_name=None, projection=None):
     if "context" in df.columns:
         context_prefix = "ctx_"
 
-        context_list = []
-        for ctx in df["context"]:
-            context_list.append(ctx if isinstance(ctx, dict) else {})
-
-        context_df = pd.DataFrame(context_list)
+        # Building the frame straight from the dicts is pandas' fast path for
+        # flat records (pd.json_normalize measured ~10x slower here)
+        context_df = pd.DataFrame(
+            [ctx if isinstance(ctx, dict) else {} for ctx in df["context"]],
+            index=df.index,
+        ).add_prefix(context_prefix)
         if not context_df.empty:
-            context_df.columns = [context_prefix + col for col in context_df.columns]
             df = df.drop(columns=["context"], errors="ignore")
             df = pd.concat([df, context_df], axis=1)
         else:
@@ -128,15 +236,16 @@ def load_events_df(collection_name=None, projection=None):
         if home_col in df.columns:
             # Support booleans or strings like "HOME"/"AWAY"
             if df[home_col].dtype == bool:
-                df["is_home"] = df[home_col].astype(int)
+                df["is_home"] = df[home_col].astype(np.int8)
             else:
-                df["is_home"] = (df[home_col].astype(str).str.upper() == "HOME").astype(int)
+                df["is_home"] = _tokens_to_01(df[home_col], {"HOME"})
             df = df.drop(columns=[home_col], errors="ignore")
 
         # Map context.pace_bucket to pace_bucket string
         pace_col = f"{context_prefix}pace_bucket"
         if pace_col in df.columns:
-            df["pace_bucket"] = df[pace_col]
+            # Few distinct values: category codes instead of one string per row
+            df["pace_bucket"] = df[pace_col].astype("category")
             df = df.drop(columns=[pace_col], errors="ignore")
 
         # Map context.competitive to is_competitive (0/1)
@@ -146,29 +255,35 @@ def load_events_df(collection_name=None, projection=None):
             # Handle common cases:
             s = df[comp_col]
             if s.dtype == bool:
-                df["is_competitive"] = s.astype(int)
+                df["is_competitive"] = s.astype(np.int8)
             else:
-                su = s.astype(str).str.upper()
-                df["is_competitive"] = su.isin(["COMP_TRUE", "TRUE", "1", "YES", "CLOSE"]).astype(int)
+                df["is_competitive"] = _tokens_to_01(s, {"COMP_TRUE", "TRUE", "1", "YES", "CLOSE"})
             df = df.drop(columns=[comp_col], errors="ignore")
 
+    # Source column names as a set, built once for the FIELD_MAPPINGS lookups below
+    # (the normalized columns added in between are not lookup targets)
+    col_set = frozenset(df.columns)
+    
     # Task: Normalize GAME_ID to string with leading zeros before any date processing
-    game_id_col = _find_field(df, FIELD_MAPPINGS["game_id"])
+    game_id_col = _find_field(col_set, FIELD_MAPPINGS["game_id"])
     if game_id_col:
         # Normalize GAME_ID to string, preserving leading zeros (zfill to 10 digits)
         df["game_id"] = df[game_id_col].astype(str).str.strip()
-        # Pad numeric GAME_IDs to 10 digits (NBA format: "0022300010")
-        df["game_id"] = df["game_id"].apply(lambda x: x.zfill(10) if x.isdigit() and len(x) < 10 else x)
+        # Pad numeric GAME_IDs to 10 digits (NBA format: "0022300010"); zfill is a
+        # no-op at >= 10 chars. A per-element comprehension beats the .str
+        # accessor here: on object-dtype strings .str.isdigit/.str.zfill are
+        # Python loops too, and the mask + where version measured ~2.5x slower.
+        df["game_id"] = [x.zfill(10) if x.isdigit() else x for x in df["game_id"].tolist()]
     else:
         print("  WARNING: GAME_ID not found, creating synthetic IDs")
         df["game_id"] = df.index.astype(str)
 
     # Ensure team_id exists
-    team_id_col = _find_field(df, FIELD_MAPPINGS["team_id"])
+    team_id_col = _find_field(col_set, FIELD_MAPPINGS["team_id"])
     if team_id_col:
         df["team_id"] = df[team_id_col].astype(str)
     else:
-        team_abbrev_col = _find_field(df, FIELD_MAPPINGS["team_abbreviation"])
+        team_abbrev_col = _find_field(col_set, FIELD_MAPPINGS["team_abbreviation"])
         if team_abbrev_col:
             df["team_id"] = df[team_abbrev_col].fillna("UNKNOWN_TEAM").astype(str)
         else:
@@ -185,15 +300,15 @@ def load_events_df(collection_name=None, projection=None):
     date_col = DATE_FIELD_OVERRIDE
     if date_col is None:
         # First try GAME_DATE (preferred field)
-        if "GAME_DATE" in df.columns:
+        if "GAME_DATE" in col_set:
             date_col = "GAME_DATE"
         else:
             # Fall back to other date mappings
-            date_col = _find_field(df, FIELD_MAPPINGS["date"])
+            date_col = _find_field(col_set, FIELD_MAPPINGS["date"])
 
     if date_col and date_col in df.columns:
         # Parse GAME_DATE (use NaT for missing values, do NOT drop rows)
-        df["date"] = pd.to_datetime(df[date_col], errors="coerce")
+        df["date"] = _parse_dates(df[date_col], date_format)
         
         # Task: Add has_real_date boolean column
         df["has_real_date"] = df["date"].notna().astype(int)
@@ -260,12 +375,9 @@ def load_events_df(collection_name=None, projection=None):
     
     # Task: Print date range only if we have real dates
     if "has_real_date" in df.columns and df["has_real_date"].sum() > 0:
-        # Only look at rows with real dates for date range
-        real_dates = df[df["has_real_date"] == 1]["date"]
-        if len(real_dates) > 0:
-            min_date = real_dates.min()
-            max_date = real_dates.max()
-            print(f"  Date range (rows with GAME_DATE): {min_date} to {max_date}")
+        # has_real_date marks exactly the non-NaT dates, and min/max skip NaT,
+        # so no filtered copy of the rows is needed
+        print(f"  Date range (rows with GAME_DATE): {df['date'].min()} to {df['date'].max()}")
     elif "date" in df.columns and df["date"].notna().sum() == 0:
         print(f"  Date ordering: GAME_ID-based (no real dates available)")
     
@@ -277,14 +389,18 @@ def load_events_df(collection_name=None, projection=None):
             is_monotonic = non_null_dates.is_monotonic_increasing
             if not is_monotonic:
                 print(f"  ⚠️  WARNING: 'date' column is not monotonic non-decreasing after sorting")
-                # Show first violation
-                for i in range(len(non_null_dates) - 1):
-                    if non_null_dates.iloc[i] > non_null_dates.iloc[i + 1]:
-                        print(f"    Violation at index {non_null_dates.index[i]}: {non_null_dates.iloc[i]} > {non_null_dates.iloc[i + 1]}")
-                        break
+                # Show first violation (one vectorized comparison of neighbours)
+                values = non_null_dates.to_numpy()
+                i = int(np.flatnonzero(values[:-1] > values[1:])[0])
+                print(f"    Violation at index {non_null_dates.index[i]}: {non_null_dates.iloc[i]} > {non_null_dates.iloc[i + 1]}")
             else:
                 print(f"  ✓ Date column is monotonic non-decreasing")
 
+    # IDs repeat across rows (~30 teams, 2 rows per game): category codes shrink
+    # them and let the per-team groupbys downstream hash small ints. String
+    # categories sort lexically, so sort order is unchanged.
+    df = df.astype({"team_id": "category", "game_id": "category"})
+
     return df
 
 
@@ -293,28 +409,11 @@ def get_base_features(df):
     Get base feature column names from DataFrame.
     Returns list of column names that are safe to use as features.
     """
-    exclude = [
-        "GAME_ID", "TEAM_ID", "TEAM_ABBREVIATION", "game_id", "team_id",
-        "date", "ctx_", "context",
-        "PRIMARY_SCORER_NAME", "PRIMARY_FACILITATOR_NAME", "PRIMARY_REBOUNDER_NAME",
-        "PRIMARY_SCORER_PLAYER_ID", "PRIMARY_FACILITATOR_PLAYER_ID", "PRIMARY_REBOUNDER_PLAYER_ID",
-    ]
-
-    exclude_patterns = [
-        "_OVER_HIT", "_MARGIN", "_ACTUAL", "_STRONG_HIT"
-    ]
-
-    feature_cols = []
-    for col in df.columns:
-        if any(ex in col for ex in exclude):
-            continue
-        if any(pattern in col for pattern in exclude_patterns):
-            continue
-
-        if col not in ["is_home", "pace_bucket", "is_competitive"]:
-            if df[col].dtype not in ["int64", "float64", "int32", "float32"]:
-                continue
-
-        feature_cols.append(col)
+    # One regex scan over the column names instead of nested any() loops
+    cols = df.columns
+    keep_mask = ~cols.str.contains(_BASE_EXCLUDE_RE)
+    numeric_dtypes = [np.dtype(t) for t in ("int64", "float64", "int32", "float32", "int8")]
+    numeric_mask = df.dtypes.isin(numeric_dtypes) | cols.isin(["is_home", "pace_bucket", "is_competitive"])
+    feature_cols = cols[keep_mask & numeric_mask].tolist()
 
     return feature_cols
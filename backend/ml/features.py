@@ -2,10 +2,16 @@
 Feature engineering with leakage-safe rolling features.
 All rolling features use shift(1) to ensure no same-game leakage.
 """
+import re
 import pandas as pd
 import numpy as np
 from .config import ROLLING_WINDOWS, LABEL_FIELD
 
+# Outcome columns never used as features (searched once per column name)
+_OUTCOME_RE = re.compile(r"_ACTUAL|_MARGIN|_STRONG_HIT")
+_LEAKY_RE = re.compile(r"_ACTUAL|_OVER_HIT|_MARGIN|_STRONG_HIT")
+_NUMERIC_DTYPES = frozenset(np.dtype(t) for t in ("int64", "float64", "int32", "float32", "int8"))
+
 
 def select_base_features(df):
     """
@@ -14,22 +20,22 @@ def select_base_features(df):
     Returns:
         DataFrame with base features added/selected
     """
-    # Context features
+    # Context features (0/1 flags are stored as int8)
     if "is_home" not in df.columns:
-        df["is_home"] = 0  # Default to away
+        df["is_home"] = np.int8(0)  # Default to away
     
     # Pace bucket one-hot encoding
     if "pace_bucket" in df.columns:
-        df["pace_low"] = (df["pace_bucket"] == "LOW").astype(int)
-        df["pace_mid"] = (df["pace_bucket"] == "MID").astype(int)
-        df["pace_high"] = (df["pace_bucket"] == "HIGH").astype(int)
+        df["pace_low"] = (df["pace_bucket"] == "LOW").astype(np.int8)
+        df["pace_mid"] = (df["pace_bucket"] == "MID").astype(np.int8)
+        df["pace_high"] = (df["pace_bucket"] == "HIGH").astype(np.int8)
     else:
-        df["pace_low"] = 0
-        df["pace_mid"] = 0
-        df["pace_high"] = 0
+        df["pace_low"] = np.int8(0)
+        df["pace_mid"] = np.int8(0)
+        df["pace_high"] = np.int8(0)
     
     if "is_competitive" not in df.columns:
-        df["is_competitive"] = 0
+        df["is_competitive"] = np.int8(0)
     
     # Market lines (required)
     if "TEAM_TOTAL_LINE" not in df.columns:
@@ -42,6 +48,77 @@ def select_base_features(df):
     return df
 
 
+def _group_layout(group_codes):
+    """
+    Sorted layout of row groups, shared by every _shifted_rolling_stats call.
+    
+    Args:
+        group_codes: Integer group code per row (-1 = missing group)
+        
+    Returns:
+        Tuple of (order, group_start, missing): the stable sort order that makes
+        groups contiguous, and per sorted row the position of its group's first
+        row and whether its code is missing
+    """
+    n = len(group_codes)
+    # Stable: keeps time order within each group
+    order = np.argsort(group_codes, kind="stable")
+    codes = group_codes[order]
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = codes[1:] != codes[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(n), 0))
+    return order, group_start, codes < 0
+
+
+def _shifted_rolling_stats(values, layout, window, with_std=True):
+    """
+    Per-group rolling mean and sample std over the previous `window` rows.
+    
+    Equivalent to groupby(group_codes).transform(lambda x: x.rolling(window,
+    min_periods=1).mean().shift(1)) (and .std() for the std) for every column,
+    computed for all groups at once: each row's lagged window is gathered into
+    a (rows x window) matrix and reduced with NumPy. The gather indices are
+    built once and shared by all columns.
+    
+    Args:
+        values: 2-D float array (rows x columns), in time order within each group
+        layout: _group_layout() of the rows' group codes (missing group -> NaN)
+        window: Window size
+        with_std: Also compute the std (otherwise None is returned for it)
+        
+    Returns:
+        Tuple of (mean, std) arrays with the same shape as values
+    """
+    n, n_cols = values.shape
+    order, group_start, missing = layout
+    pos = np.arange(n)
+    
+    # Row i's window is rows i-1 .. i-window of its own group (the shift(1))
+    lags = pos[:, None] - np.arange(1, window + 1)
+    in_group = lags >= group_start[:, None]
+    lag_rows = order[np.maximum(lags, 0)]
+    
+    mean_out = np.empty((n, n_cols))
+    std_out = np.empty((n, n_cols)) if with_std else None
+    for j in range(n_cols):
+        windowed = np.where(in_group, values[lag_rows, j], np.nan)
+        count = np.count_nonzero(~np.isnan(windowed), axis=1)
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(windowed, axis=1) / count
+            if with_std:
+                var = np.nansum((windowed - mean[:, None]) ** 2, axis=1) / (count - 1)
+                var[count < 2] = np.nan  # sample std needs 2 observations
+        
+        mean[missing] = np.nan
+        mean_out[order, j] = mean
+        if with_std:
+            var[missing] = np.nan
+            std_out[order, j] = np.sqrt(var)
+    
+    return mean_out, std_out
+
+
 def rolling_features(df, team_id_col="team_id", windows=None):
     """
     Compute leakage-safe rolling features.
@@ -53,7 +130,7 @@ def rolling_features(df, team_id_col="team_id", windows=None):
         windows: List of window sizes (defaults to config)
         
     Returns:
-        DataFrame with rolling features added
+        New DataFrame with rolling features added (df itself is not modified)
     """
     if windows is None:
         windows = ROLLING_WINDOWS
@@ -62,88 +139,106 @@ def rolling_features(df, team_id_col="team_id", windows=None):
     
     # Task 3: Ensure df is sorted by GAME_DATE (chronological) within each TEAM_ID
     # For leakage-safe rolling features, we need time-ordered data per team
+    # (sort_values already returns a new frame; unsorted input gets a shallow copy)
+    is_copy = False
     if "date" in df.columns and team_id_col in df.columns:
         # Sort by team_id, then date (ensuring chronological order per team)
         df = df.sort_values([team_id_col, "date"], ascending=[True, True], na_position="last").reset_index(drop=True)
+        is_copy = True
         print(f"  Sorted by {team_id_col}, then date (chronological order per team)")
     elif "date" in df.columns:
         # Fallback: just sort by date if team_id missing
         if not df["date"].is_monotonic_increasing:
             df = df.sort_values("date", na_position="last").reset_index(drop=True)
+            is_copy = True
             print(f"  Sorted by date (no team_id column)")
     else:
         print(f"  WARNING: No 'date' column for chronological sorting")
     
-    # Create a copy to avoid modifying original
-    df = df.copy()
+    # Shallow copy so the caller's frame is never modified: below, columns are
+    # only replaced or added (never written into), which leaves shared data as is
+    if not is_copy:
+        df = df.copy(deep=False)
+    
+    # Team grouping for the rolling windows below (computed once for every
+    # column and window)
+    team_layout = _group_layout(pd.factorize(df[team_id_col])[0])
+    
+    # New columns are collected here and added in one concat at the end
+    # (one assignment per column fragments the frame's blocks)
+    rolling_cols = {}
     
     # Numeric margin fields: rolling mean/std
     margin_cols = [col for col in df.columns if col.endswith("_MARGIN") and df[col].dtype in ["int64", "float64"]]
     
-    for margin_col in margin_cols:
-        if margin_col not in df.columns:
-            continue
+    if margin_cols:
+        # All margin columns at once per window
+        values = df[margin_cols].to_numpy(dtype=np.float64)
+        stats = {window: _shifted_rolling_stats(values, team_layout, window) for window in windows}
         
-        base_name = margin_col.replace("_MARGIN", "")
-        
-        for window in windows:
-            # Group by team, compute rolling stats, then shift by 1
-            # Use transform to align results back to original index
-            rolling_mean = df.groupby(team_id_col)[margin_col].transform(
-                lambda x: x.rolling(window=window, min_periods=1).mean().shift(1)
-            )
-            df[f"rolling_{base_name}_margin_mean_{window}"] = rolling_mean
-            
-            rolling_std = df.groupby(team_id_col)[margin_col].transform(
-                lambda x: x.rolling(window=window, min_periods=1).std().shift(1)
-            )
-            df[f"rolling_{base_name}_margin_std_{window}"] = rolling_std
+        for j, margin_col in enumerate(margin_cols):
+            base_name = margin_col.replace("_MARGIN", "")
+            for window in windows:
+                # Per team: rolling stats over the previous `window` games (shifted by 1)
+                rolling_mean, rolling_std = stats[window]
+                rolling_cols[f"rolling_{base_name}_margin_mean_{window}"] = rolling_mean[:, j]
+                rolling_cols[f"rolling_{base_name}_margin_std_{window}"] = rolling_std[:, j]
     
     # Boolean hit-rate fields: rolling hit rates
-    hit_cols = [col for col in df.columns if col.endswith("_OVER_HIT") and df[col].dtype in ["int64", "float64", "bool"]]
+    # (skip the label column itself; we don't want to use it as a feature)
+    hit_cols = [
+        col for col in df.columns
+        if col.endswith("_OVER_HIT") and df[col].dtype in ["int64", "float64", "bool"] and col != LABEL_FIELD
+    ]
+    
+    # Special: team total and game total rates (both group by team; game total
+    # is same for both teams in a game)
+    special_cols = [
+        (target_col, base_name)
+        for target_col, base_name in [
+            ("TEAM_TOTAL_OVER_HIT", "team_total"),
+            ("GAME_TOTAL_OVER_HIT", "game_total"),
+        ]
+        if target_col in df.columns
+    ]
     
-    for hit_col in hit_cols:
-        # Skip the label column itself (we don't want to use it as a feature)
-        if hit_col == LABEL_FIELD:
-            continue
-        
-        base_name = hit_col.replace("_OVER_HIT", "")
-        
-        # Convert to numeric if boolean
-        if df[hit_col].dtype == "bool":
-            df[hit_col] = df[hit_col].astype(int)
-        
-        for window in windows:
-            # Group by team, compute rolling mean (hit rate), then shift by 1
-            rolling_rate = df.groupby(team_id_col)[hit_col].transform(
-                lambda x: x.rolling(window=window, min_periods=1).mean().shift(1)
-            )
-            df[f"rolling_{base_name}_over_rate_{window}"] = rolling_rate
-    
-    # Special: team total and game total rates
-    for target_col, base_name in [
-        ("TEAM_TOTAL_OVER_HIT", "team_total"),
-        ("GAME_TOTAL_OVER_HIT", "game_total"),
-    ]:
-        if target_col not in df.columns:
-            continue
+    rate_cols = list(dict.fromkeys(hit_cols + [target_col for target_col, _ in special_cols]))
+    
+    # Convert to numeric if boolean
+    for col in rate_cols:
+        if df[col].dtype == "bool":
+            df[col] = df[col].astype(int)
+    
+    if rate_cols:
+        # All hit-rate columns at once per window (no std needed)
+        values = df[rate_cols].to_numpy(dtype=np.float64)
+        rates = {window: _shifted_rolling_stats(values, team_layout, window, with_std=False)[0] for window in windows}
+        rate_pos = {col: j for j, col in enumerate(rate_cols)}
         
-        if df[target_col].dtype == "bool":
-            df[target_col] = df[target_col].astype(int)
+        for hit_col in hit_cols:
+            base_name = hit_col.replace("_OVER_HIT", "")
+            for window in windows:
+                # Per team: hit rate over the previous `window` games (shifted by 1)
+                rolling_cols[f"rolling_{base_name}_over_rate_{window}"] = rates[window][:, rate_pos[hit_col]]
         
-        for window in windows:
-            if target_col == "TEAM_TOTAL_OVER_HIT":
-                # Group by team
-                rolling_rate = df.groupby(team_id_col)[target_col].transform(
-                    lambda x: x.rolling(window=window, min_periods=1).mean().shift(1)
-                )
-                df[f"rolling_{base_name}_over_rate_{window}"] = rolling_rate
-            else:
-                # Game total: group by team (game total is same for both teams in a game)
-                rolling_rate = df.groupby(team_id_col)[target_col].transform(
-                    lambda x: x.rolling(window=window, min_periods=1).mean().shift(1)
-                )
-                df[f"rolling_{base_name}_over_rate_{window}"] = rolling_rate
+        for target_col, base_name in special_cols:
+            for window in windows:
+                rolling_cols[f"rolling_{base_name}_over_rate_{window}"] = rates[window][:, rate_pos[target_col]]
+    
+    if rolling_cols:
+        # Recomputing on a frame that already has rolling columns replaces them
+        existing = [c for c in rolling_cols if c in df.columns]
+        if existing:
+            df = df.drop(columns=existing)
+        # Stored as float32: the models train on float32 features anyway, so
+        # this halves the columns' memory without changing model inputs.
+        # copy=False: df is already this function's own copy, so its blocks are
+        # reused instead of copied again
+        df = pd.concat(
+            [df, pd.DataFrame(rolling_cols, index=df.index, dtype=np.float32)],
+            axis=1,
+            copy=False,
+        )
     
     print(f"  Added {len([c for c in df.columns if c.startswith('rolling_')])} rolling features")
     
@@ -160,9 +255,9 @@ def finalize_matrix(df, label_col, feature_cols=None):
         feature_cols: Optional list of feature columns (auto-detected if None)
         
     Returns:
-        X: Feature matrix (DataFrame)
-        y: Label vector (Series)
-        meta: Metadata columns (DataFrame with date, team_id, game_id, line)
+        df_final: DataFrame with the feature columns, then the label, then the
+            metadata columns (date, team_id, game_id, line)
+        feature_cols: List of feature column names
     """
     # Check label column exists
     if label_col not in df.columns:
@@ -185,16 +280,12 @@ def finalize_matrix(df, label_col, feature_cols=None):
     # Select feature columns
     if feature_cols is None:
         # Auto-detect: all numeric columns except metadata, label, and outcome columns
-        exclude = ["game_id", "team_id", "date", label_col]
-        # Also exclude outcome columns (ACTUAL, OVER_HIT except label, MARGIN, STRONG_HIT)
-        # But keep LINE columns as they are market features
-        exclude_patterns = ["_ACTUAL", "_MARGIN", "_STRONG_HIT"]
-        if label_col.endswith("_OVER_HIT"):
-            # Exclude other _OVER_HIT columns but keep the label for now (it's already excluded)
-            pass
+        exclude = {"game_id", "team_id", "date", label_col}
+        # Also exclude outcome columns (ACTUAL, OVER_HIT except label, MARGIN, STRONG_HIT,
+        # see _OUTCOME_RE). But keep LINE columns as they are market features
         
         # Task 2: Remove ID columns from features (they leak signal/memorization)
-        id_exclude = [
+        id_exclude = {
             "TEAM_ID", "team_id",
             "TEAM_ABBREVIATION", "team_abbreviation",
             "GAME_ID", "game_id",
@@ -204,47 +295,36 @@ def finalize_matrix(df, label_col, feature_cols=None):
             "PRIMARY_SCORER_NAME",
             "PRIMARY_FACILITATOR_NAME",
             "PRIMARY_REBOUNDER_NAME",
-        ]
+        }
         
         feature_cols = []
-        for col in df.columns:
+        for col, dtype in df.dtypes.items():
             if col in exclude:
                 continue
             # Skip ID columns (Task 2)
             if col in id_exclude:
                 continue
             # Skip outcome columns
-            if any(pattern in col for pattern in exclude_patterns):
+            if _OUTCOME_RE.search(col):
                 continue
             # Skip _OVER_HIT columns (except label which is already excluded)
-            if col.endswith("_OVER_HIT") and col != label_col:
+            if col.endswith("_OVER_HIT"):
                 continue
             # Only include numeric columns
-            if df[col].dtype in ["int64", "float64", "int32", "float32"]:
+            if dtype in _NUMERIC_DTYPES:
                 feature_cols.append(col)
     
-    # Remove any feature columns that don't exist
-    feature_cols = [col for col in feature_cols if col in df.columns]
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    feature_cols_unique = []
-    for col in feature_cols:
-        if col not in seen:
-            seen.add(col)
-            feature_cols_unique.append(col)
-    feature_cols = feature_cols_unique
+    # Remove any feature columns that don't exist, and duplicates (dict.fromkeys
+    # keeps the first occurrence, in order)
+    available = frozenset(df.columns)
+    feature_cols = [col for col in dict.fromkeys(feature_cols) if col in available]
     
     # Task 3: Hard block outcome leakage with assertion
-    leaky_patterns = ["_ACTUAL", "_OVER_HIT", "_MARGIN", "_STRONG_HIT"]
-    leaky_cols = []
-    for col in feature_cols:
-        # Rolling features are allowed (they start with "rolling_")
-        if col.startswith("rolling_"):
-            continue
-        # Check if column contains any leaky pattern
-        if any(pattern in col for pattern in leaky_patterns):
-            leaky_cols.append(col)
+    # Rolling features are allowed (they start with "rolling_")
+    leaky_cols = [
+        col for col in feature_cols
+        if not col.startswith("rolling_") and _LEAKY_RE.search(col)
+    ]
     
     if leaky_cols:
         bad_cols_preview = leaky_cols[:5]
@@ -256,66 +336,108 @@ def finalize_matrix(df, label_col, feature_cols=None):
     
     print(f"  Using {len(feature_cols)} feature columns")
     
-    # Extract X, y, meta
-    # Ensure X doesn't have duplicate columns (in case df has duplicate column names)
-    X = df[feature_cols].copy()
-    if X.columns.duplicated().any():
-        print(f"  WARNING: Duplicate columns detected in X, removing duplicates...")
-        X = X.loc[:, ~X.columns.duplicated()]
-        # Update feature_cols to match
-        feature_cols = X.columns.tolist()
-    y = df[label_col].copy()
-    
     # Meta columns
     # Exclude TEAM_TOTAL_LINE from meta if it's already in features (it's a feature, not metadata)
     meta_cols = ["date", "team_id", "game_id", "TEAM_TOTAL_LINE"]
     meta_cols = [col for col in meta_cols if col in df.columns]
-    # Remove TEAM_TOTAL_LINE from meta if it's in features (to avoid duplicate when concatenating)
+    # Remove TEAM_TOTAL_LINE from meta if it's in features (to avoid a duplicate column)
     if "TEAM_TOTAL_LINE" in feature_cols:
         meta_cols = [col for col in meta_cols if col != "TEAM_TOTAL_LINE"]
-    meta = df[meta_cols].copy()
     
-    # Convert y to int if it's bool
-    if y.dtype == "bool":
-        y = y.astype(int)
+    # Convert y to int if it's bool (df is already our own copy from dropna)
+    if df[label_col].dtype == "bool":
+        df[label_col] = df[label_col].astype(int)
+    
+    # Extract features + label + meta in one column selection (a single new frame,
+    # instead of copying X, y and meta separately and concatenating them afterwards)
+    df_final = df[feature_cols + [label_col] + meta_cols]
+    # Ensure there are no duplicate columns (in case df has duplicate column names)
+    if df_final.columns.duplicated().any():
+        print(f"  WARNING: Duplicate columns detected in X, removing duplicates...")
+        df_final = df_final.loc[:, ~df_final.columns.duplicated()]
+        # Update feature_cols to match
+        feature_cols = list(dict.fromkeys(feature_cols))
     
-    print(f"  Final matrix shape: X={X.shape}, y={y.shape}")
-    print(f"  Label distribution: y.mean()={y.mean():.3f}")
+    print(f"  Final matrix shape: X=({len(df_final)}, {len(feature_cols)}), y=({len(df_final)},)")
+    print(f"  Label distribution: y.mean()={df_final[label_col].mean():.3f}")
     
-    return X, y, meta
+    return df_final, feature_cols
 
 
-def verify_no_leakage(df, feature_col, label_col, team_id_col="team_id", n_check=10):
+# Rolling feature name -> (source column suffix, statistic); see rolling_features
+_ROLLING_NAME_RE = re.compile(r"^rolling_(.+)_(margin_mean|margin_std|over_rate)_(\d+)$")
+_ROLLING_SPECIAL_SOURCES = {"team_total": "TEAM_TOTAL_OVER_HIT", "game_total": "GAME_TOTAL_OVER_HIT"}
+
+
+def _rolling_source(feature_col):
     """
-    Safety check: verify that rolling features don't leak same-game information.
-    Spot-checks that rolling feature at row i only uses rows < i.
+    Source column, statistic and window of a rolling feature built by rolling_features.
     
-    This is a basic check - the real guarantee is shift(1) in rolling_features().
+    Returns:
+        Tuple of (source_col, stat, window), with stat "mean" or "std"; None if
+        feature_col is not a rolling feature name
     """
-    print(f"  Verifying no leakage for {feature_col}...")
-    
-    if feature_col not in df.columns:
-        print(f"    WARNING: {feature_col} not found, skipping check")
-        return True
+    match = _ROLLING_NAME_RE.match(feature_col)
+    if match is None:
+        return None
+    base_name, kind, window = match.groups()
+    if kind == "over_rate":
+        source_col = _ROLLING_SPECIAL_SOURCES.get(base_name, f"{base_name}_OVER_HIT")
+        return source_col, "mean", int(window)
+    return f"{base_name}_MARGIN", kind.split("_")[1], int(window)
+
+
+def verify_no_leakage(df, feature_col, team_id_col="team_id", n_check=10, seed=42):
+    """
+    Safety check: verify that a rolling feature doesn't leak same-game information.
     
-    # Sample a few rows
-    check_indices = np.random.choice(len(df), min(n_check, len(df)), replace=False)
+    Samples up to n_check teams and recomputes the feature for their rows
+    independently with pandas (per team: rolling(window, min_periods=1), then
+    shift(1), so only previous games count). Any mismatch means the feature
+    includes something other than the team's previous games, e.g. the current one.
     
-    for idx in check_indices:
-        row = df.iloc[idx]
-        team_id = row[team_id_col]
-        
-        # Get all previous rows for this team
-        team_mask = (df[team_id_col] == team_id) & (df.index < idx)
-        prev_rows = df[team_mask]
+    Args:
+        df: DataFrame as returned by rolling_features (rows in time order per team)
+        feature_col: Rolling feature column to check
+        team_id_col: Column name for team identifier
+        n_check: Number of teams to sample
+        seed: Random seed for the team sample
         
-        if len(prev_rows) == 0:
-            continue  # First game for this team, can't check
+    Returns:
+        True if the sampled rows match
         
-        # The rolling feature should only depend on previous rows
-        # This is verified by the shift(1) in rolling_features()
-        # We just check that NaN values appear at expected positions (first few rows per team)
-        # This is a heuristic check
-        pass
+    Raises:
+        ValueError: If feature_col is not a rolling feature or its source column is missing
+        AssertionError: If the feature differs from the shift(1) reference
+    """
+    print(f"  Verifying no leakage for {feature_col}...")
+    
+    parsed = _rolling_source(feature_col)
+    if parsed is None:
+        raise ValueError(f"{feature_col} is not a rolling feature")
+    source_col, stat, window = parsed
+    if feature_col not in df.columns or source_col not in df.columns:
+        raise ValueError(f"Cannot verify {feature_col}: needs columns {feature_col} and {source_col}")
+    
+    # Sample whole teams, so each sampled row's previous games are all present
+    teams = df[team_id_col].dropna().unique()
+    rng = np.random.default_rng(seed)
+    sampled = rng.choice(np.asarray(teams, dtype=object), min(n_check, len(teams)), replace=False)
+    rows = df.loc[df[team_id_col].isin(sampled), [team_id_col, source_col, feature_col]]
+    
+    team = rows[team_id_col]
+    source = rows[source_col].astype(np.float64)
+    rolled = getattr(source.groupby(team, observed=True, sort=False).rolling(window, min_periods=1), stat)()
+    expected = rolled.droplevel(0).reindex(rows.index).groupby(team, observed=True, sort=False).shift(1)
+    
+    actual = rows[feature_col].to_numpy(dtype=np.float64)
+    # float32 storage (see rolling_features) -> compare with a float32-sized tolerance
+    matches = np.isclose(actual, expected.to_numpy(), rtol=1e-5, atol=1e-6, equal_nan=True)
+    if not matches.all():
+        first_bad = rows.index[np.flatnonzero(~matches)[0]]
+        raise AssertionError(
+            f"Rolling feature leakage detected: {feature_col} differs from the shift(1) reference "
+            f"on {int((~matches).sum())}/{len(rows)} sampled rows (first at index {first_bad})"
+        )
     
     return True
@@ -1,16 +1,19 @@
 """
 Inspect data: print data summary without running full pipeline.
 """
+import re
 import pandas as pd
 from .data import load_events_df
 
+_DATE_SEASON_RE = re.compile(r"SEASON|YEAR|DATE|TIME", re.IGNORECASE)
+
 
 def cmd_inspect_data(args):
     """Inspect loaded data without running pipeline."""
     print("Inspecting data from MongoDB...")
     
-    # Load data
-    df = load_events_df()
+    # Load data (all fields: inspection should see what the pipeline excludes too)
+    df = load_events_df(projection={"_id": 0})
     
     print("\n" + "=" * 80)
     print("DATA INSPECTION")
@@ -20,12 +23,7 @@ def cmd_inspect_data(args):
     print(f"Total columns: {len(df.columns)}")
     
     # Find columns containing SEASON/YEAR/DATE/TIME (case-insensitive)
-    date_season_keywords = ['SEASON', 'YEAR', 'DATE', 'TIME']
-    date_season_cols = []
-    for col in df.columns:
-        col_upper = col.upper()
-        if any(kw in col_upper for kw in date_season_keywords):
-            date_season_cols.append(col)
+    date_season_cols = [col for col in df.columns if _DATE_SEASON_RE.search(col)]
     
     if date_season_cols:
         print(f"\nColumns containing SEASON/YEAR/DATE/TIME: {date_season_cols}")
@@ -37,7 +35,11 @@ def cmd_inspect_data(args):
         game_dates = df['GAME_DATE'].dropna()
         if len(game_dates) > 0:
             try:
-                dates_parsed = pd.to_datetime(game_dates, errors='coerce')
+                # Mongo dates are already datetime64; only strings need parsing
+                if pd.api.types.is_datetime64_any_dtype(game_dates):
+                    dates_parsed = game_dates
+                else:
+                    dates_parsed = pd.to_datetime(game_dates, errors='coerce')
                 valid_dates = dates_parsed.notna().sum()
                 coverage_pct = (valid_dates / len(df) * 100) if len(df) > 0 else 0
                 
@@ -63,10 +65,12 @@ def cmd_inspect_data(args):
             break
     
     if season_col:
-        seasons = sorted(df[season_col].dropna().unique())
+        # One counting pass instead of a full-column comparison per season
+        season_counts = df[season_col].value_counts()
+        seasons = sorted(season_counts.index)
         print(f"\nDistinct values for {season_col} (showing top 10):")
         for s in seasons[:10]:
-            count = (df[season_col] == s).sum()
+            count = season_counts[s]
             print(f"  {s}: {count} docs")
         if len(seasons) > 10:
             print(f"  ... ({len(seasons) - 10} more)")
@@ -1,8 +1,9 @@
 """
 Interpretability: Extract and visualize model coefficients.
 """
-import json
+import heapq
 import numpy as np
+import orjson
 import pandas as pd
 from typing import Dict, List, Tuple
 from pathlib import Path
@@ -48,21 +49,19 @@ def get_top_coefficients(coef_dict, n=10):
     Returns:
         Tuple of (top_positive, top_negative) lists of (feature, coef) tuples
     """
-    # Filter by sign (exclude exactly 0 from both lists)
-    positive_coefs = [(feat, coef) for feat, coef in coef_dict.items() if coef > 0]
-    negative_coefs = [(feat, coef) for feat, coef in coef_dict.items() if coef < 0]
-    
-    # Sort positive descending (largest first)
-    if positive_coefs:
-        top_positive = sorted(positive_coefs, key=lambda x: x[1], reverse=True)[:n]
-    else:
-        top_positive = []
-    
-    # Sort negative ascending (most negative first)
-    if negative_coefs:
-        top_negative = sorted(negative_coefs, key=lambda x: x[1])[:n]
-    else:
-        top_negative = []
+    # Split by sign in one pass (exclude exactly 0 from both lists)
+    positive_coefs = []
+    negative_coefs = []
+    for item in coef_dict.items():
+        if item[1] > 0:
+            positive_coefs.append(item)
+        elif item[1] < 0:
+            negative_coefs.append(item)
+    
+    # Top n only, without sorting the full lists (same order and ties as
+    # sorted(...)[:n]): positive descending, negative most negative first
+    top_positive = heapq.nlargest(n, positive_coefs, key=lambda x: x[1])
+    top_negative = heapq.nsmallest(n, negative_coefs, key=lambda x: x[1])
     
     return top_positive, top_negative
 
@@ -134,7 +133,6 @@ def save_coefficients(coef_dict, output_path=None):
         "n_features": len(coef_dict),
     }
     
-    with open(output_path, "w") as f:
-        json.dump(coef_json, f, indent=2)
+    Path(output_path).write_bytes(orjson.dumps(coef_json, option=orjson.OPT_INDENT_2))
     
     print(f"\nSaved coefficients to {output_path}")
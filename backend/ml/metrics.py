@@ -19,6 +19,26 @@ def compute_metrics(y_true, y_pred_proba, threshold=0.5):
     Returns:
         Dictionary with metrics
     """
+    return _compute_metrics(y_true, y_pred_proba, threshold, _has_both_classes(y_true))
+
+
+def _has_both_classes(y_true):
+    """True if y_true contains exactly two classes (ROC-AUC is defined)."""
+    return len(np.unique(y_true)) == 2
+
+
+def _compute_metrics(y_true, y_pred_proba, threshold, both_classes, constant=False):
+    """
+    compute_metrics body, with the label-only class check passed in.
+    
+    constant=True marks y_pred_proba as one repeated probability by construction
+    (the 0.5 baseline), scored in closed form. Single-class labels still take the
+    general path, so log_loss raises for them as before.
+    """
+    y_pred_proba = np.asarray(y_pred_proba)
+    if constant and both_classes:
+        return _constant_metrics(y_true, float(y_pred_proba[0]), threshold)
+    
     # Convert probabilities to binary predictions
     y_pred = (y_pred_proba >= threshold).astype(int)
     
@@ -33,7 +53,7 @@ def compute_metrics(y_true, y_pred_proba, threshold=0.5):
     
     # ROC-AUC (only if both classes present)
     try:
-        if len(np.unique(y_true)) == 2:
+        if both_classes:
             roc_auc = roc_auc_score(y_true, y_pred_proba)
         else:
             roc_auc = None
@@ -51,6 +71,33 @@ def compute_metrics(y_true, y_pred_proba, threshold=0.5):
     return metrics
 
 
+def _constant_metrics(y_true, p, threshold):
+    """
+    Closed-form metrics for a constant prediction p (e.g. the 0.5 baseline).
+    
+    Every row gets the same score, so ROC-AUC is exactly 0.5 and accuracy and
+    log loss depend only on the positive rate; no sort or per-row log pass.
+    """
+    y_true = np.asarray(y_true)
+    n = len(y_true)
+    pos_rate = np.count_nonzero(y_true) / n
+    
+    accuracy = pos_rate if p >= threshold else 1.0 - pos_rate
+    
+    # Same clipping as the general path
+    epsilon = 1e-15
+    p_clipped = min(max(p, epsilon), 1 - epsilon)
+    loss = -(pos_rate * np.log(p_clipped) + (1.0 - pos_rate) * np.log(1.0 - p_clipped))
+    
+    return {
+        "accuracy": float(accuracy),
+        "log_loss": float(loss),
+        "roc_auc": 0.5,
+        "threshold": threshold,
+        "n_samples": n,
+    }
+
+
 def compute_calibration(y_true, y_pred_proba, n_bins=10):
     """
     Compute calibration table (bins by predicted probability).
@@ -111,3 +158,34 @@ def compute_all_metrics(y_true, y_pred_proba, threshold=0.5, n_bins=10):
     calibration_df = compute_calibration(y_true, y_pred_proba, n_bins=n_bins)
     
     return metrics, calibration_df
+
+
+def compute_all_metrics_batch(y_true, probas, threshold=0.5, n_bins=10, constant_names=()):
+    """
+    Compute metrics and calibration for several probability arrays on the same labels.
+    
+    Label-only work (array conversion, the two-class check for ROC-AUC) is done
+    once instead of once per array.
+    
+    Args:
+        y_true: True labels (0/1)
+        probas: Dict of name -> predicted probabilities for class 1
+        threshold: Classification threshold (default 0.5)
+        n_bins: Number of calibration bins (default 10)
+        constant_names: Names in probas that hold a single repeated probability
+            (e.g. the 0.5 baseline); their metrics are computed in closed form
+        
+    Returns:
+        Dict of name -> (metrics_dict, calibration_df)
+    """
+    y_true = np.asarray(y_true)
+    both_classes = _has_both_classes(y_true)
+    
+    results = {}
+    for name, y_pred_proba in probas.items():
+        y_pred_proba = np.asarray(y_pred_proba)
+        metrics = _compute_metrics(y_true, y_pred_proba, threshold, both_classes, constant=name in constant_names)
+        calibration_df = compute_calibration(y_true, y_pred_proba, n_bins=n_bins)
+        results[name] = (metrics, calibration_df)
+    
+    return results
@@ -5,6 +5,7 @@ Loads saved model.joblib and generates predictions for upcoming games.
 import pandas as pd
 import numpy as np
 import joblib
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 from backend.ml.config import OUTPUT_DIR, LABEL_FIELD
@@ -14,13 +15,17 @@ from backend.ml.features import select_base_features, rolling_features
 MODEL_PATH = OUTPUT_DIR / "model.joblib"
 
 
+@lru_cache(maxsize=2)
+def _load_model_file(path_str, mtime_ns):
+    return joblib.load(path_str)
+
+
 def load_model():
-    """Load the saved model from model.joblib."""
+    """Load the saved model from model.joblib (cached until the file changes)."""
     if not MODEL_PATH.exists():
         raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Run backtest first to generate model.")
     
-    model = joblib.load(MODEL_PATH)
-    return model
+    return _load_model_file(str(MODEL_PATH), MODEL_PATH.stat().st_mtime_ns)
 
 
 def prepare_future_features(df_future, df_history=None):
@@ -65,7 +70,7 @@ def prepare_future_features(df_future, df_history=None):
     return df_future_with_features
 
 
-def predict_future_games(df_future, df_history=None, feature_cols=None):
+def predict_future_games(df_future, df_history=None, feature_cols=None, model=None):
     """
     Generate predictions for future games.
     
@@ -73,12 +78,14 @@ def predict_future_games(df_future, df_history=None, feature_cols=None):
         df_future: DataFrame with future games (must have date, team_id, game_id, TEAM_TOTAL_LINE)
         df_history: Optional DataFrame with historical games for rolling features
         feature_cols: Optional list of feature columns (auto-detected from model if None)
+        model: Optional already-loaded model (defaults to load_model())
         
     Returns:
         DataFrame with predictions added (columns: game_id, team_id, date, p_hat, confidence, recommended_side, etc.)
     """
     # Load model
-    model = load_model()
+    if model is None:
+        model = load_model()
     
     # Prepare features
     df_features = prepare_future_features(df_future, df_history)
@@ -99,7 +106,7 @@ def predict_future_games(df_future, df_history=None, feature_cols=None):
         except Exception:
             # Fallback: use all numeric columns except metadata
             exclude = ["game_id", "team_id", "date", LABEL_FIELD, "TEAM_TOTAL_ACTUAL", "GAME_TOTAL_ACTUAL"]
-            feature_cols = [col for col in df_features.columns if col not in exclude and df_features[col].dtype in ["int64", "float64"]]
+            feature_cols = [col for col in df_features.columns if col not in exclude and df_features[col].dtype in ["int64", "float64", "int32", "float32", "int8"]]
             # Remove duplicate feature names
             feature_cols = list(dict.fromkeys(feature_cols))  # Preserves order
     
@@ -111,8 +118,8 @@ def predict_future_games(df_future, df_history=None, feature_cols=None):
         print(f"WARNING: Missing {len(missing_features)} features, using {len(available_features)} available features")
         print(f"  Missing: {missing_features[:10]}...")
     
-    # Get feature matrix
-    X_future = df_features[available_features].copy()
+    # Get feature matrix (column selection already returns a new frame)
+    X_future = df_features[available_features]
     
     # Predict probabilities
     try:
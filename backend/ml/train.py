@@ -9,11 +9,10 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.impute import SimpleImputer
 from sklearn.linear_model import LogisticRegression
 from sklearn.compose import ColumnTransformer
-from sklearn.calibration import CalibratedClassifierCV
-from sklearn.isotonic import IsotonicRegression
+from sklearn.isotonic import isotonic_regression
 
 
-def train_model(X_train, y_train, C=None, max_iter=None):
+def train_model(X_train, y_train, C=None, max_iter=None, init_coef=None, init_intercept=None):
     """
     Train a LogisticRegression model with preprocessing pipeline.
     
@@ -22,6 +21,8 @@ def train_model(X_train, y_train, C=None, max_iter=None):
         y_train: Training labels (Series)
         C: Regularization strength (defaults to config)
         max_iter: Maximum iterations (defaults to config)
+        init_coef: Optional starting coefficients (e.g. the previous fold's coef_)
+        init_intercept: Optional starting intercept (used with init_coef)
         
     Returns:
         Fitted pipeline model
@@ -64,18 +65,222 @@ def train_model(X_train, y_train, C=None, max_iter=None):
         )),
     ])
     
+    # Warm start: begin the solver from the given coefficients instead of zeros.
+    # Same objective, so it converges to the same optimum in fewer iterations.
+    if init_coef is not None:
+        classifier = pipeline.named_steps["classifier"]
+        classifier.set_params(warm_start=True)
+        classifier.coef_ = np.array(init_coef, dtype=np.float64)
+        classifier.intercept_ = np.array(init_intercept if init_intercept is not None else [0.0], dtype=np.float64)
+        try:
+            pipeline.fit(X_train, y_train)
+            return pipeline
+        except ValueError as e:
+            # Shape mismatch (e.g. the imputer dropped an all-NaN column this fold)
+            print(f"    WARNING: Warm start failed ({e}), fitting from scratch")
+            classifier.set_params(warm_start=False)
+            del classifier.coef_, classifier.intercept_
+    
     # Fit pipeline
     pipeline.fit(X_train, y_train)
     
     return pipeline
 
 
+def fit_predict_logistic_newton(X_train, y_train, X_test, C=None, max_iter=25, tol=1e-8):
+    """
+    Task 5: Fast path for tiny models (e.g. the line-only baseline).
+    
+    Fits the same model as train_model (median imputation, standardization,
+    L2-penalized LogisticRegression with the same C) by damped Newton steps in
+    NumPy. With 1-2 features each step is a 3x3 solve, so this converges in a
+    handful of iterations without the sklearn pipeline overhead. Each step is
+    shortened by backtracking until the penalized log loss decreases enough;
+    if that fails or max_iter runs out before convergence, it warns and falls
+    back to train_model.
+    
+    Args:
+        X_train: Training features (DataFrame or array, numeric)
+        y_train: Training labels (0/1)
+        X_test: Test features with the same columns
+        C: Regularization strength (defaults to config)
+        max_iter: Maximum Newton iterations
+        tol: Convergence tolerance on the parameter step
+        
+    Returns:
+        Array of P(y=1) for X_test
+    """
+    from .config import LOGISTIC_C
+    
+    if C is None:
+        C = LOGISTIC_C
+    
+    X_train_in, X_test_in = X_train, X_test
+    X_train = np.asarray(X_train, dtype=np.float64)
+    X_test = np.asarray(X_test, dtype=np.float64)
+    y = np.asarray(y_train, dtype=np.float64)
+    if len(np.unique(y)) < 2:
+        raise ValueError("This solver needs samples of at least 2 classes in the data")
+    
+    # SimpleImputer(strategy="median") drops all-NaN columns, then fills NaNs
+    keep = ~np.all(np.isnan(X_train), axis=0)
+    X_train = X_train[:, keep]
+    X_test = X_test[:, keep]
+    medians = np.nanmedian(X_train, axis=0)
+    X_train = np.where(np.isnan(X_train), medians, X_train)
+    X_test = np.where(np.isnan(X_test), medians, X_test)
+    
+    # StandardScaler (population std; constant columns are left unscaled)
+    mean = X_train.mean(axis=0)
+    scale = X_train.std(axis=0)
+    scale[scale == 0] = 1.0
+    Xb = np.column_stack([np.ones(len(X_train)), (X_train - mean) / scale])
+    Xb_test = np.column_stack([np.ones(len(X_test)), (X_test - mean) / scale])
+    
+    # Minimize sum(log loss) + ||w||^2 / (2C); the intercept is not penalized
+    penalty = np.full(Xb.shape[1], 1.0 / C)
+    penalty[0] = 0.0
+    
+    def objective(beta):
+        z = Xb @ beta
+        return np.sum(np.logaddexp(0.0, z) - y * z) + 0.5 * np.sum(penalty * beta ** 2)
+    
+    beta = np.zeros(Xb.shape[1])
+    loss = objective(beta)
+    converged = False
+    for _ in range(max_iter):
+        p = 1.0 / (1.0 + np.exp(-(Xb @ beta)))
+        grad = Xb.T @ (p - y) + penalty * beta
+        hess = (Xb.T * (p * (1.0 - p))) @ Xb + np.diag(penalty)
+        step = np.linalg.solve(hess, grad)
+        if np.max(np.abs(step)) < tol:
+            beta -= step
+            converged = True
+            break
+        
+        # Backtracking (Armijo) line search on the penalized log loss
+        decrease = grad @ step
+        t = 1.0
+        new_beta = beta - step
+        new_loss = objective(new_beta)
+        while not new_loss <= loss - 1e-4 * t * decrease:
+            t *= 0.5
+            if t < 1e-10:
+                break
+            new_beta = beta - t * step
+            new_loss = objective(new_beta)
+        if t < 1e-10:
+            break  # no descent along the Newton direction
+        beta, loss = new_beta, new_loss
+    
+    if not converged:
+        print(f"    WARNING: Newton solver did not converge in {max_iter} iterations, falling back to LogisticRegression")
+        model = train_model(pd.DataFrame(X_train_in), y_train, C=C)
+        return model.predict_proba(pd.DataFrame(X_test_in))[:, 1]
+    
+    return 1.0 / (1.0 + np.exp(-(Xb_test @ beta)))
+
+
+def fit_isotonic(proba_cal, y_cal):
+    """
+    Task 2: Fit an increasing isotonic map from P(y=1) to the label rate.
+    
+    Same result as IsotonicRegression(out_of_bounds="clip").fit(proba_cal, y_cal)
+    (sort, average tied probabilities, pool adjacent violators, keep only the
+    breakpoints), without the estimator's validation and interp1d setup, which
+    dominate on a fold's small calibration set. Predict with predict_isotonic.
+    
+    Args:
+        proba_cal: Uncalibrated probabilities (1-D array)
+        y_cal: Labels (0/1)
+        
+    Returns:
+        Tuple of (x_thresholds, y_thresholds) arrays
+    """
+    x = np.asarray(proba_cal, dtype=np.float64).reshape(-1)
+    y = np.asarray(y_cal, dtype=np.float64).reshape(-1)
+    if len(x) == 0 or len(x) != len(y):
+        raise ValueError(f"Need matching non-empty inputs, got {len(x)} probabilities and {len(y)} labels")
+    if not (np.isfinite(x).all() and np.isfinite(y).all()):
+        raise ValueError("Input contains NaN or infinity")
+    
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+    # Tied probabilities become one point: mean label, weighted by the tie count
+    x_unique, start, counts = np.unique(x, return_index=True, return_counts=True)
+    y_mean = np.add.reduceat(y, start) / counts
+    y_fit = isotonic_regression(y_mean, sample_weight=counts.astype(np.float64))
+    
+    # Drop interior points on a flat step (they don't change the interpolation)
+    keep = np.ones(len(y_fit), dtype=bool)
+    keep[1:-1] = (y_fit[1:-1] != y_fit[:-2]) | (y_fit[1:-1] != y_fit[2:])
+    return x_unique[keep], y_fit[keep]
+
+
+def predict_isotonic(thresholds, proba):
+    """Linear interpolation between fit_isotonic breakpoints, constant beyond them."""
+    x_thresholds, y_thresholds = thresholds
+    return np.interp(np.asarray(proba, dtype=np.float64), x_thresholds, y_thresholds)
+
+
+class ProbabilityCalibrator:
+    """
+    Task 2: 1-D calibration map fitted on base-model P(y=1).
+    
+    "sigmoid" is Platt scaling (logistic regression on the probability),
+    "isotonic" is isotonic regression (fit_isotonic). Fitting needs only the
+    base model's probabilities, so callers that already have them skip
+    re-running the base model.
+    """
+    
+    def __init__(self, method="sigmoid"):
+        if method not in ("sigmoid", "isotonic"):
+            raise ValueError(f"Unknown calibration method: {method}")
+        self.method = method
+        self.model = None
+    
+    def fit(self, proba_cal, y_cal):
+        """Fit on uncalibrated probabilities (1-D array) and labels; returns self."""
+        proba_cal = np.asarray(proba_cal)
+        if self.method == "sigmoid":
+            self.model = LogisticRegression()
+            self.model.fit(proba_cal.reshape(-1, 1), y_cal)
+        else:
+            # (x_thresholds, y_thresholds) of the isotonic map
+            self.model = fit_isotonic(proba_cal, y_cal)
+        return self
+    
+    def transform(self, proba):
+        """Map uncalibrated P(y=1) (1-D array) to calibrated P(y=1)."""
+        proba = np.asarray(proba)
+        if self.method == "sigmoid":
+            return self.model.predict_proba(proba.reshape(-1, 1))[:, 1]
+        # Ensure probabilities are in [0, 1]
+        return np.clip(predict_isotonic(self.model, proba), 0, 1)
+
+
+class CalibratedWrapper:
+    """Base model + ProbabilityCalibrator, exposing predict_proba."""
+    
+    def __init__(self, base_model, calibrator):
+        self.base_model = base_model
+        self.calibrator = calibrator
+    
+    def predict_proba(self, X):
+        proba = self.base_model.predict_proba(X)[:, 1]
+        calibrated_proba = self.calibrator.transform(proba)
+        # Return in shape [n_samples, 2]
+        return np.column_stack([1 - calibrated_proba, calibrated_proba])
+
+
 def train_calibrated_model(base_model, X_cal, y_cal, method="sigmoid"):
     """
     Task 2: Fit a calibrated classifier using calibration data.
     
     Uses manual calibration (Platt scaling for sigmoid, isotonic regression for isotonic)
-    since cv="prefit" may not work in all sklearn versions.
+    since cv="prefit" may not work in all sklearn versions. The base model is
+    treated as frozen: it is never refit, and X_cal goes through it exactly once
+    (the same effect as sklearn 1.6+'s FrozenEstimator, on the pinned 1.3).
     
     Args:
         base_model: Pre-fitted base model
@@ -86,54 +291,13 @@ def train_calibrated_model(base_model, X_cal, y_cal, method="sigmoid"):
     Returns:
         Calibrated model wrapper that implements predict_proba
     """
-    from sklearn.linear_model import LogisticRegression as LogReg
+    calibrator = ProbabilityCalibrator(method)
     
     # Get uncalibrated predictions from base model
     proba_cal = base_model.predict_proba(X_cal)[:, 1]
+    calibrator.fit(proba_cal, y_cal)
     
-    if method == "sigmoid":
-        # Platt scaling: fit logistic regression to transform probabilities
-        # Reshape for sklearn
-        proba_cal_2d = proba_cal.reshape(-1, 1)
-        cal_model = LogReg()
-        cal_model.fit(proba_cal_2d, y_cal)
-        
-        # Create a wrapper that applies calibration during predict_proba
-        class CalibratedWrapper:
-            def __init__(self, base_model, cal_model):
-                self.base_model = base_model
-                self.cal_model = cal_model
-            
-            def predict_proba(self, X):
-                proba = self.base_model.predict_proba(X)[:, 1].reshape(-1, 1)
-                calibrated_proba = self.cal_model.predict_proba(proba)[:, 1]
-                # Return in shape [n_samples, 2]
-                return np.column_stack([1 - calibrated_proba, calibrated_proba])
-        
-        return CalibratedWrapper(base_model, cal_model)
-    
-    elif method == "isotonic":
-        # Isotonic regression
-        isotonic = IsotonicRegression(out_of_bounds="clip")
-        isotonic.fit(proba_cal, y_cal)
-        
-        class CalibratedWrapper:
-            def __init__(self, base_model, isotonic):
-                self.base_model = base_model
-                self.isotonic = isotonic
-            
-            def predict_proba(self, X):
-                proba = self.base_model.predict_proba(X)[:, 1]
-                calibrated_proba = self.isotonic.predict(proba)
-                # Ensure probabilities are in [0, 1]
-                calibrated_proba = np.clip(calibrated_proba, 0, 1)
-                # Return in shape [n_samples, 2]
-                return np.column_stack([1 - calibrated_proba, calibrated_proba])
-        
-        return CalibratedWrapper(base_model, isotonic)
-    
-    else:
-        raise ValueError(f"Unknown calibration method: {method}")
+    return CalibratedWrapper(base_model, calibrator)
 
 
 def predict_proba(model, X_test):
@@ -141,7 +305,7 @@ def predict_proba(model, X_test):
     Predict probabilities for test set.
     
     Args:
-        model: Fitted pipeline model or CalibratedClassifierCV
+        model: Fitted pipeline model or CalibratedWrapper
         X_test: Test features (DataFrame)
         
     Returns: